@@ -1,20 +1,33 @@
 """Applications API - Create and manage grant applications."""
-import json
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterable, Iterator, List, Literal, Optional, Dict, Any, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import Row, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-import io
 
-from app.models.database import get_db, User, Application, GrantProgram, ApplicationStatus, UserProfile
+from app.models.database import get_db, dialect_insert, User, Application, ApplicationStatus, GrantProgram, UserProfile
 from app.api.auth import get_current_user
-from app.services.ai_writing import ai_writing_service
-from app.services.pdf_generator import generate_application_pdf, generate_grant_summary_pdf
+from app.api.programs import get_program_by_id
+from app.services.ai_writing import AIWritingService, get_ai_writing_service
+from app.services.pdf_generator import iter_application_pdf
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
+# Rows fetched per round trip when streaming the list as NDJSON
+NDJSON_BATCH_SIZE = 200
+
+# The list endpoint only needs these, so it skips loading full ORM entities
+APPLICATION_LIST_COLUMNS = (
+    Application.id, Application.program_id, Application.status,
+    Application.completeness_score, Application.created_at,
+    Application.updated_at, Application.submitted_at,
+    GrantProgram.name.label("program_name"),
+)
+
 
 # ============ Schemas ============
 
@@ -33,9 +46,9 @@ class ApplicationResponse(BaseModel):
     program_name: str
     status: str
     completeness_score: float
-    created_at: str
-    updated_at: str
-    submitted_at: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    submitted_at: Optional[datetime]
 
     class Config:
         from_attributes = True
@@ -46,71 +59,190 @@ class ApplicationListResponse(BaseModel):
     applications: List[ApplicationResponse]
 
 
+class ApplicationFormDataResponse(BaseModel):
+    application_id: str
+    program_id: str
+    program_name: str
+    form_data: Dict[str, Any]
+    status: str
+
+
+class NarrativesResponse(BaseModel):
+    sections: Dict[str, str]
+    message: str
+
+
 # ============ Helpers ============
 
 def build_app_response(app: Application) -> ApplicationResponse:
-    """Build ApplicationResponse from Application model."""
-    return ApplicationResponse(
+    """Build ApplicationResponse from Application model (trusted, so unvalidated)."""
+    return ApplicationResponse.model_construct(
         id=app.id, program_id=app.program_id,
         program_name=app.program.name if app.program else "Unknown",
-        status=app.status.value, completeness_score=app.completeness_score or 0,
-        created_at=app.created_at.isoformat(), updated_at=app.updated_at.isoformat(),
-        submitted_at=app.submitted_at.isoformat() if app.submitted_at else None
+        status=app.status.value, completeness_score=app.completeness_score or 0.0,
+        created_at=app.created_at, updated_at=app.updated_at, submitted_at=app.submitted_at
+    )
+
+
+def build_app_row_response(row: Row) -> ApplicationResponse:
+    """Build ApplicationResponse from an APPLICATION_LIST_COLUMNS row."""
+    return ApplicationResponse.model_construct(
+        id=row.id, program_id=row.program_id,
+        program_name=row.program_name or "Unknown",
+        status=row.status.value, completeness_score=row.completeness_score or 0.0,
+        created_at=row.created_at, updated_at=row.updated_at, submitted_at=row.submitted_at
     )
 
 
+def get_application_with_profile(db: Session, app_id: str, user_id: str) -> Tuple[Application, Optional[UserProfile]]:
+    """Load an application, its program and the owner's profile in one query."""
+    row = db.query(Application, UserProfile).options(
+        joinedload(Application.program)
+    ).outerjoin(
+        UserProfile, UserProfile.user_id == Application.user_id
+    ).filter(
+        Application.id == app_id, Application.user_id == user_id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return row[0], row[1]
+
+
+def narrative_inputs(app: Application, profile: Optional[UserProfile]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Profile and program details the AI writing service works from."""
+    profile_data = {}
+    if profile:
+        profile_data = {
+            "full_name": profile.full_name,
+            "organization_name": profile.organization_name,
+            "organization_type": profile.organization_type,
+            "ein": profile.ein,
+            "city": profile.city,
+            "state": profile.state,
+        }
+
+    program_data = {}
+    if app.program:
+        program_data = {
+            "name": app.program.name,
+            "agency": app.program.agency,
+            "min_award": app.program.min_award,
+            "max_award": app.program.max_award,
+        }
+    return profile_data, program_data
+
+
+async def narrative_section_stream(
+    db: Session,
+    app: Application,
+    section_type: str,
+    max_words: int,
+    context: Dict[str, Any]
+) -> AsyncIterator[str]:
+    """
+    Yield one section's text as it is generated, then save it with the other narratives.
+
+    If generation fails partway the error propagates and nothing is saved.
+    """
+    chunks = []
+    async for chunk in get_ai_writing_service().generate_narrative_stream(
+        section_type=section_type, context=context, max_words=max_words
+    ):
+        chunks.append(chunk)
+        yield chunk
+
+    narratives = {**(app.form_data or {}).get("narratives", {}), section_type: "".join(chunks).strip()}
+    app.form_data = {**(app.form_data or {}), "narratives": narratives}
+    db.commit()
+
+
+async def narrative_event_stream(
+    db: Session,
+    app: Application,
+    profile_data: Dict[str, Any],
+    program_data: Dict[str, Any],
+    project_summary: Optional[str]
+) -> AsyncIterator[str]:
+    """Yield generated sections as SSE events, saving them in one write at the end."""
+    sections = {}
+    async for section, section_text in get_ai_writing_service().generate_application_sections_stream(
+        profile_data=profile_data,
+        program_data=program_data,
+        project_summary=project_summary
+    ):
+        sections[section] = section_text
+        yield f"data: {orjson.dumps({'section': section, 'text': section_text}).decode()}\n\n"
+
+    app.form_data = {**(app.form_data or {}), "narratives": sections}
+    db.commit()
+    yield "event: done\ndata: {}\n\n"
+
+
+def application_ndjson_stream(rows: Iterable[Row]) -> Iterator[bytes]:
+    """Yield one JSON-encoded application per line (sync, so batch fetches run in the threadpool)."""
+    for row in rows:
+        yield orjson.dumps(build_app_row_response(row).model_dump()) + b"\n"
+
+
 # ============ Endpoints ============
 
 @router.get("/", response_model=ApplicationListResponse)
-async def list_applications(
+def list_applications(
     status: Optional[ApplicationStatus] = None,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List user's applications."""
-    query = db.query(Application).options(joinedload(Application.program)).filter(
-        Application.user_id == current_user.id
-    )
+    """List user's applications (``format=ndjson`` streams one application per line)."""
+    stmt = select(*APPLICATION_LIST_COLUMNS).outerjoin(
+        GrantProgram, GrantProgram.id == Application.program_id
+    ).where(Application.user_id == current_user.id)
     if status:
-        query = query.filter(Application.status == status)
-    apps = query.order_by(Application.updated_at.desc()).all()
-    return ApplicationListResponse(
-        total=len(apps), applications=[build_app_response(a) for a in apps]
+        stmt = stmt.where(Application.status == status)
+    stmt = stmt.order_by(Application.updated_at.desc())
+
+    if response_format == "ndjson":
+        rows = db.execute(stmt.execution_options(yield_per=NDJSON_BATCH_SIZE))
+        return StreamingResponse(application_ndjson_stream(rows), media_type="application/x-ndjson")
+
+    rows = db.execute(stmt).all()
+    return ApplicationListResponse.model_construct(
+        total=len(rows), applications=[build_app_row_response(row) for row in rows]
     )
 
 
 @router.post("/", response_model=ApplicationResponse)
-async def create_application(
+def create_application(
     data: ApplicationCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new application for a grant program."""
     # Verify program exists
-    program = db.query(GrantProgram).filter(GrantProgram.id == data.program_id).first()
+    program = get_program_by_id(db, data.program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
 
-    # Check for existing draft
-    existing = db.query(Application).filter(
-        Application.user_id == current_user.id,
-        Application.program_id == data.program_id,
-        Application.status == ApplicationStatus.DRAFT
-    ).first()
-
-    if existing:
+    # Insert unless a draft already exists (the partial unique index decides)
+    stmt = dialect_insert(db, Application).values(
+        user_id=current_user.id, program_id=data.program_id, status=ApplicationStatus.DRAFT
+    ).on_conflict_do_nothing(
+        index_elements=["user_id", "program_id"],
+        index_where=text("status = 'draft'")
+    ).returning(Application)
+    app = db.scalars(stmt).first()
+
+    if app is None:
+        db.rollback()
         raise HTTPException(status_code=400, detail="You already have a draft application for this program")
 
-    app = Application(user_id=current_user.id, program_id=data.program_id)
-    db.add(app)
+    app.program = program
     db.commit()
-    db.refresh(app)
-    app.program = program  # Set program for build_app_response
     return build_app_response(app)
 
 
 @router.get("/{app_id}", response_model=ApplicationResponse)
-async def get_application(
+def get_application(
     app_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -125,7 +257,7 @@ async def get_application(
 
 
 @router.patch("/{app_id}", response_model=ApplicationResponse)
-async def update_application(
+def update_application(
     app_id: str,
     updates: ApplicationUpdate,
     current_user: User = Depends(get_current_user),
@@ -139,19 +271,23 @@ async def update_application(
         raise HTTPException(status_code=404, detail="Application not found")
 
     if updates.form_data:
-        app.form_data = json.dumps(updates.form_data)
+        app.form_data = updates.form_data
     if updates.status:
         app.status = updates.status
         if updates.status == ApplicationStatus.SUBMITTED:
             app.submitted_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(app)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Moving back to draft collides with another draft (the partial unique index)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="You already have a draft application for this program")
     return build_app_response(app)
 
 
-@router.get("/{app_id}/form-data")
-async def get_application_form_data(
+@router.get("/{app_id}/form-data", response_model=ApplicationFormDataResponse)
+def get_application_form_data(
     app_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -163,134 +299,98 @@ async def get_application_form_data(
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    form_data = json.loads(app.form_data) if app.form_data else {}
-    return {
-        "application_id": app.id,
-        "program_id": app.program_id,
-        "program_name": app.program.name if app.program else "Unknown",
-        "form_data": form_data,
-        "status": app.status.value
-    }
+    return ApplicationFormDataResponse.model_construct(
+        application_id=app.id,
+        program_id=app.program_id,
+        program_name=app.program.name if app.program else "Unknown",
+        form_data=app.form_data or {},
+        status=app.status.value
+    )
 
 
-@router.post("/{app_id}/generate-narratives")
+@router.post("/{app_id}/generate-narratives", response_model=NarrativesResponse)
 async def generate_narratives(
     app_id: str,
     project_summary: Optional[str] = None,
+    stream: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Generate AI narratives for application sections."""
-    app = db.query(Application).options(
-        joinedload(Application.program)
-    ).filter(
-        Application.id == app_id, Application.user_id == current_user.id
-    ).first()
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
+    """Generate AI narratives for application sections.
 
-    # Get user profile for context
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    With ``stream=true`` each section is sent as a server-sent event as soon
+    as it is generated; the narratives are saved once all sections are done.
+    """
+    app, profile = get_application_with_profile(db, app_id, current_user.id)
+    profile_data, program_data = narrative_inputs(app, profile)
 
-    profile_data = {}
-    if profile:
-        profile_data = {
-            "full_name": profile.full_name,
-            "organization_name": profile.organization_name,
-            "organization_type": profile.organization_type,
-            "ein": profile.ein,
-            "city": profile.city,
-            "state": profile.state,
-        }
-
-    program_data = {}
-    if app.program:
-        program_data = {
-            "name": app.program.name,
-            "agency": app.program.agency,
-            "min_award": app.program.min_award,
-            "max_award": app.program.max_award,
-        }
+    if stream:
+        return StreamingResponse(
+            narrative_event_stream(db, app, profile_data, program_data, project_summary),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
 
     # Generate narratives
-    sections = await ai_writing_service.generate_application_sections(
+    sections = await get_ai_writing_service().generate_application_sections(
         profile_data=profile_data,
         program_data=program_data,
         project_summary=project_summary
     )
 
-    # Save to form_data
-    existing_data = json.loads(app.form_data) if app.form_data else {}
-    existing_data["narratives"] = sections
-    app.form_data = json.dumps(existing_data)
+    # Save to form_data (assign a new dict so the JSON column sees the change)
+    app.form_data = {**(app.form_data or {}), "narratives": sections}
     db.commit()
 
-    return {"sections": sections, "message": "Narratives generated successfully"}
+    return NarrativesResponse.model_construct(sections=sections, message="Narratives generated successfully")
 
 
-@router.get("/{app_id}/pdf")
-async def download_application_pdf(
+@router.post("/{app_id}/generate-narratives/{section_type}")
+async def generate_narrative_section(
     app_id: str,
+    section_type: str,
+    project_summary: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Download application as PDF."""
-    app = db.query(Application).options(
-        joinedload(Application.program)
-    ).filter(
-        Application.id == app_id, Application.user_id == current_user.id
-    ).first()
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    # Get user profile
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    """Stream a single narrative section as plain text while it is generated."""
+    max_words = dict(AIWritingService.SECTION_TYPES).get(section_type)
+    if max_words is None:
+        raise HTTPException(status_code=404, detail="Unknown narrative section")
 
-    # Build data for PDF
-    form_data = json.loads(app.form_data) if app.form_data else {}
+    app, profile = get_application_with_profile(db, app_id, current_user.id)
+    profile_data, program_data = narrative_inputs(app, profile)
+    context = AIWritingService.build_context(profile_data, program_data, project_summary)
 
-    application_data = {
-        "id": app.id,
-        "status": app.status.value,
-        "created_at": app.created_at.isoformat(),
-        "submitted_at": app.submitted_at.isoformat() if app.submitted_at else None,
-        "form_data": form_data,
-    }
+    return StreamingResponse(
+        narrative_section_stream(db, app, section_type, max_words, context),
+        media_type="text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-cache"}
+    )
 
-    program_data = None
-    if app.program:
-        program_data = {
-            "name": app.program.name,
-            "agency": app.program.agency,
-            "description": app.program.description,
-            "deadline": app.program.deadline.isoformat() if app.program.deadline else None,
-            "min_award": app.program.min_award,
-            "max_award": app.program.max_award,
-        }
 
-    profile_data = None
-    if profile:
-        profile_data = {
-            "full_name": profile.full_name,
-            "organization_name": profile.organization_name,
-            "organization_type": profile.organization_type,
-            "city": profile.city,
-            "state": profile.state,
-        }
+@router.get("/{app_id}/pdf")
+def download_application_pdf(
+    app_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download application as PDF."""
+    app, profile = get_application_with_profile(db, app_id, current_user.id)
 
-    # Generate PDF
-    pdf_buffer = generate_application_pdf(application_data, program_data, profile_data)
+    form_data = app.form_data or {}
 
     filename = f"application_{app.id[:8]}.pdf"
     return StreamingResponse(
-        io.BytesIO(pdf_buffer),
+        iter_application_pdf(app, profile=profile, program=app.program,
+                             narratives=form_data.get("narratives")),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
 @router.delete("/{app_id}")
-async def delete_application(
+def delete_application(
     app_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1,7 +1,12 @@
 """Authentication API - Email/password and Apple Sign-In."""
+import hashlib
+import secrets
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
@@ -10,11 +15,19 @@ from jose import JWTError, jwt
 import bcrypt
 
 from app.models.database import get_db, User
-from app.config.settings import settings
+from app.config.settings import get_settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+# Short-lived caches so authenticated requests skip JWT decode and the users
+# SELECT. The TTL is far below token lifetime and `exp` is still enforced.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)  # sha256(token) -> (user_id, exp, jti)
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)   # user_id -> detached User
+# jti of logged-out tokens, kept until the token would have expired anyway
+_revoked_tokens: TTLCache = TTLCache(maxsize=100_000, ttl=get_settings().access_token_expire_minutes * 60)
+_auth_cache_lock = threading.Lock()
+
 
 # ============ Schemas ============
 
@@ -55,9 +68,10 @@ class AppleSignInRequest(BaseModel):
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token."""
+    settings = get_settings()
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16)})
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -66,10 +80,56 @@ def verify_password(plain: str, hashed: str) -> bool:
 
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=get_settings().bcrypt_rounds)).decode('utf-8')
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True if the hash was made with a different cost than bcrypt_rounds ($2b$<cost>$...)."""
+    return hashed.split("$")[2] != f"{get_settings().bcrypt_rounds:02d}"
+
+
+def decode_token_cached(token: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Return (user_id, jti) for a valid, unrevoked token, or None."""
+    token_key = hashlib.sha256(token.encode('utf-8')).digest()
+    with _auth_cache_lock:
+        cached_token = _token_cache.get(token_key)
+    if cached_token and cached_token[1] > time.time():
+        user_id, _, jti = cached_token
+    else:
+        settings = get_settings()
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError:
+            return None
+        user_id, jti = payload.get("sub"), payload.get("jti")
+        if user_id is None:
+            return None
+        with _auth_cache_lock:
+            _token_cache[token_key] = (user_id, payload.get("exp", 0), jti)
+
+    with _auth_cache_lock:
+        if jti in _revoked_tokens:
+            return None
+    return user_id, jti
+
+
+def build_user_response(user: User) -> UserResponse:
+    """Build UserResponse from a User (trusted, so unvalidated)."""
+    return UserResponse.model_construct(
+        id=user.id, email=user.email, subscription_tier=user.subscription_tier or "free"
+    )
 
 
-async def get_current_user(
+def build_auth_response(user: User) -> AuthResponse:
+    """Issue a token for the user and wrap it with their details."""
+    return AuthResponse.model_construct(
+        access_token=create_access_token({"sub": user.id}),
+        token_type="bearer",
+        user=build_user_response(user)
+    )
+
+
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -79,24 +139,30 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    claims = decode_token_cached(token)
+    if claims is None:
         raise credentials_exception
+    user_id = claims[0]
+
+    with _auth_cache_lock:
+        cached_user = _user_cache.get(user_id)
+    if cached_user is not None:
+        # Attach a session-local copy without emitting a SELECT
+        return db.merge(cached_user, load=False)
 
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
-    return user
+    db.expunge(user)
+    with _auth_cache_lock:
+        _user_cache[user_id] = user
+    return db.merge(user, load=False)
 
 
 # ============ Endpoints ============
 
 @router.post("/register", response_model=AuthResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register with email/password and return token."""
     existing = db.query(User).filter(User.email == user_data.email).first()
     if existing:
@@ -108,19 +174,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
 
     # Auto-login: generate token
-    token = create_access_token({"sub": user.id})
-    return AuthResponse(
-        access_token=token,
-        token_type="bearer",
-        user=UserResponse(id=user.id, email=user.email, subscription_tier=user.subscription_tier or "free")
-    )
+    return build_auth_response(user)
 
 
 @router.post("/token", response_model=AuthResponse)
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -139,19 +199,16 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = hash_password(form_data.password)
     user.last_login_at = datetime.utcnow()
     db.commit()
 
-    token = create_access_token({"sub": user.id})
-    return AuthResponse(
-        access_token=token,
-        token_type="bearer",
-        user=UserResponse(id=user.id, email=user.email, subscription_tier=user.subscription_tier or "free")
-    )
+    return build_auth_response(user)
 
 
 @router.post("/apple", response_model=Token)
-async def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_db)):
+def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_db)):
     """Sign in with Apple."""
     # TODO: Verify identity_token with Apple's public keys
     # For now, trust the apple_user_id
@@ -166,16 +223,31 @@ async def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_d
         )
         db.add(user)
         db.commit()
-        db.refresh(user)
 
     user.last_login_at = datetime.utcnow()
     db.commit()
 
     token = create_access_token({"sub": user.id})
-    return {"access_token": token, "token_type": "bearer"}
+    return Token.model_construct(access_token=token, token_type="bearer")
+
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the current access token."""
+    claims = decode_token_cached(token)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if claims[1]:
+        with _auth_cache_lock:
+            _revoked_tokens[claims[1]] = True
+    return {"message": "Logged out"}
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user info."""
-    return current_user
+    return build_user_response(current_user)
@@ -1,14 +1,25 @@
 """Eligibility API - Check user eligibility for programs."""
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import threading
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.models.database import get_db, User, UserProfile, GrantProgram
+from app.models.database import get_db, User, UserProfile, GrantProgram, GrantCategory
 from app.api.auth import get_current_user
+from app.api.programs import get_program_by_id
 
 router = APIRouter(prefix="/api/eligibility", tags=["Eligibility"])
 
+# Per-user full ranking, keyed by user id and tagged with the profile's updated_at;
+# limited requests are served by slicing it.
+# Programs change rarely, so the TTL bounds how stale a catalog edit can be.
+_eligibility_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_eligibility_cache_lock = threading.Lock()
+
 
 # ============ Schemas ============
 
@@ -28,68 +39,128 @@ class EligibilityResponse(BaseModel):
 
 # ============ Helpers ============
 
-def check_program_eligibility(profile: UserProfile, program: GrantProgram) -> EligibilityCheck:
-    """Check if a user profile is eligible for a program."""
-    missing = []
-    score = 100.0
-
-    # Basic requirements for most grants
-    if not profile.organization_name and program.category.value != "education":
-        missing.append("Organization name required")
-        score -= 20
+class Rule(NamedTuple):
+    """An eligibility requirement: failing `predicate` costs `penalty` points."""
+    predicate: Callable[[UserProfile, Optional[GrantCategory], bool], bool]
+    penalty: float
+    message: str
 
-    if not profile.ein and program.category.value not in ["education", "individual"]:
-        missing.append("EIN (Tax ID) required for federal grants")
-        score -= 15
 
-    if not profile.address or not profile.city or not profile.state:
-        missing.append("Complete address required")
-        score -= 10
+FEDERAL_AGENCIES = frozenset({"USDA", "SBA", "HHS", "DOC"})
+EIN_EXEMPT_CATEGORIES = frozenset({GrantCategory.EDUCATION})
+HEALTHCARE_ORG_TYPES = frozenset({"healthcare", "nonprofit", "hospital", "clinic"})
 
+# Rules are (profile, category, federal) -> failed; order sets message order
+BASE_RULES = [
+    # Basic requirements for most grants
+    Rule(lambda p, cat, fed: not p.organization_name and cat is not GrantCategory.EDUCATION,
+         20, "Organization name required"),
+    Rule(lambda p, cat, fed: not p.ein and cat not in EIN_EXEMPT_CATEGORIES,
+         15, "EIN (Tax ID) required for federal grants"),
+    Rule(lambda p, cat, fed: not p.address or not p.city or not p.state,
+         10, "Complete address required"),
     # SAM.gov registration for federal grants
-    if program.agency in ["USDA", "SBA", "HHS", "DOC"] and not profile.sam_registered:
-        missing.append("SAM.gov registration required")
-        score -= 15
-
-    if not profile.uei_number and program.agency in ["USDA", "SBA", "HHS", "DOC"]:
-        missing.append("UEI number required for federal grants")
-        score -= 15
-
-    # Category-specific checks
-    if program.category.value == "small_business":
-        if not profile.annual_revenue:
-            missing.append("Annual revenue information needed")
-            score -= 10
-        if not profile.employee_count:
-            missing.append("Employee count needed")
-            score -= 10
-
-    if program.category.value == "healthcare":
-        if profile.organization_type not in ["healthcare", "nonprofit", "hospital", "clinic"]:
-            missing.append("Must be healthcare organization")
-            score -= 30
-
-    score = max(0, score)
-    eligible = len(missing) == 0 or score >= 70
-
+    Rule(lambda p, cat, fed: fed and not p.sam_registered,
+         15, "SAM.gov registration required"),
+    Rule(lambda p, cat, fed: fed and not p.uei_number,
+         15, "UEI number required for federal grants"),
+]
+
+CATEGORY_RULES = {
+    GrantCategory.SMALL_BUSINESS: [
+        Rule(lambda p, cat, fed: not p.annual_revenue, 10, "Annual revenue information needed"),
+        Rule(lambda p, cat, fed: not p.employee_count, 10, "Employee count needed"),
+    ],
+    GrantCategory.HEALTHCARE: [
+        Rule(lambda p, cat, fed: p.organization_type not in HEALTHCARE_ORG_TYPES,
+             30, "Must be healthcare organization"),
+    ],
+}
+
+
+def evaluate_rules(profile: UserProfile, category: Optional[GrantCategory], federal: bool) -> Tuple[float, List[str]]:
+    """
+    Score a profile against the eligibility rules.
+
+    Every rule depends only on the profile plus the program's category and
+    whether its agency is federal, so programs sharing that signature share
+    one result.
+    """
+    failed = [
+        rule for rule in chain(BASE_RULES, CATEGORY_RULES.get(category, ()))
+        if rule.predicate(profile, category, federal)
+    ]
+    score = 100.0 - sum(rule.penalty for rule in failed)
+    return max(0, score), [rule.message for rule in failed]
+
+
+def is_eligible(score: float, missing: List[str]) -> bool:
+    """A program is eligible with no missing requirements or a score of 70+."""
+    return len(missing) == 0 or score >= 70
+
+
+def build_eligibility_check(program_id: str, score: float, missing: List[str]) -> EligibilityCheck:
+    """Build EligibilityCheck from a rule evaluation."""
     return EligibilityCheck(
-        program_id=program.id,
-        eligible=eligible,
+        program_id=program_id,
+        eligible=is_eligible(score, missing),
         match_score=score,
         missing_requirements=missing,
         notes=f"Match score: {score}%" if missing else "You appear to meet all requirements"
     )
 
 
+def check_program_eligibility(profile: UserProfile, program: GrantProgram) -> EligibilityCheck:
+    """Check if a user profile is eligible for a program."""
+    score, missing = evaluate_rules(profile, program.category, program.agency in FEDERAL_AGENCIES)
+    return build_eligibility_check(program.id, score, missing)
+
+
+def score_all_programs(profile: UserProfile, programs) -> List[Tuple[str, float, List[str]]]:
+    """
+    Score many programs at once.
+
+    Takes (id, category, agency) rows and evaluates the rules once per
+    distinct (category, federal) signature instead of once per program.
+    Programs with the same signature share one missing-requirements list.
+    """
+    outcomes = {}
+    scored = []
+    for program_id, category, agency in programs:
+        signature = (category, agency in FEDERAL_AGENCIES)
+        outcome = outcomes.get(signature)
+        if outcome is None:
+            outcome = outcomes[signature] = evaluate_rules(profile, *signature)
+        scored.append((program_id, *outcome))
+    return scored
+
+
+def rank_eligibility(scored: List[Tuple[str, float, List[str]]]) -> EligibilityResponse:
+    """Build the response from scored programs, best match first."""
+    top = sorted(scored, key=itemgetter(1), reverse=True)
+    return EligibilityResponse(
+        total_programs=len(scored),
+        eligible_count=sum(1 for _, score, missing in scored if is_eligible(score, missing)),
+        programs=[build_eligibility_check(*s) for s in top]
+    )
+
+
+def invalidate_eligibility_cache(user_id: str) -> None:
+    """Drop cached eligibility results for a user (call after profile edits)."""
+    with _eligibility_cache_lock:
+        _eligibility_cache.pop(user_id, None)
+
+
 # ============ Endpoints ============
 
 @router.get("/check", response_model=EligibilityResponse)
-async def check_eligibility(
+def check_eligibility(
+    limit: Optional[int] = Query(None, ge=1, description="Only return the best N matches"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Check eligibility for all active programs."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    """Check eligibility for all active programs, best match first."""
+    profile = current_user.profile
 
     if not profile:
         return EligibilityResponse(
@@ -98,30 +169,37 @@ async def check_eligibility(
             programs=[]
         )
 
-    programs = db.query(GrantProgram).filter(GrantProgram.is_active.is_(True)).all()
-
-    results = [check_program_eligibility(profile, p) for p in programs]
-    eligible_count = sum(1 for r in results if r.eligible)
-
-    # Sort by match score descending
-    results.sort(key=lambda x: x.match_score, reverse=True)
-
+    with _eligibility_cache_lock:
+        cached = _eligibility_cache.get(current_user.id)
+    if cached and cached[0] == profile.updated_at:
+        response = cached[1]
+    else:
+        programs = db.query(GrantProgram.id, GrantProgram.category, GrantProgram.agency).filter(
+            GrantProgram.is_active.is_(True)
+        ).all()
+        response = rank_eligibility(score_all_programs(profile, programs))
+        with _eligibility_cache_lock:
+            _eligibility_cache[current_user.id] = (profile.updated_at, response)
+
+    if limit is None:
+        return response
+    # The counts still cover every program
     return EligibilityResponse(
-        total_programs=len(programs),
-        eligible_count=eligible_count,
-        programs=results
+        total_programs=response.total_programs,
+        eligible_count=response.eligible_count,
+        programs=response.programs[:limit]
     )
 
 
 @router.get("/check/{program_id}", response_model=EligibilityCheck)
-async def check_program_eligibility_endpoint(
+def check_program_eligibility_endpoint(
     program_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Check eligibility for a specific program."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    program = db.query(GrantProgram).filter(GrantProgram.id == program_id).first()
+    profile = current_user.profile
+    program = get_program_by_id(db, program_id)
 
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
@@ -1,12 +1,11 @@
 """Notifications API for device registration and preferences."""
-import json
 from datetime import datetime
 from typing import List
 from fastapi import APIRouter, Depends, BackgroundTasks
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.models.database import get_db, User, DeviceToken, NotificationPreference
+from app.models.database import get_db, dialect_insert, User, DeviceToken, NotificationPreference
 from app.api.auth import get_current_user
 from app.services.push_notifications import DeadlineNotificationService
 
@@ -40,38 +39,35 @@ class NotificationPreferencesResponse(BaseModel):
 # ============ Endpoints ============
 
 @router.post("/device")
-async def register_device(
+def register_device(
     request: DeviceRegistration,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Register a device for push notifications."""
-    # Check if token already exists for this user
-    existing = db.query(DeviceToken).filter(
-        DeviceToken.user_id == current_user.id,
-        DeviceToken.device_token == request.device_token
-    ).first()
-
-    if existing:
-        # Update last seen timestamp
-        existing.updated_at = datetime.utcnow()
-        db.commit()
-        return {"message": "Device token updated"}
-
-    # Create new device token
-    device = DeviceToken(
+    # Insert, or bump updated_at if this user already registered the token
+    now = datetime.utcnow()
+    stmt = dialect_insert(db, DeviceToken).values(
         user_id=current_user.id,
         device_token=request.device_token,
-        platform=request.platform
+        platform=request.platform,
+        created_at=now,
+        updated_at=now
     )
-    db.add(device)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "device_token"],
+        set_={"updated_at": now}
+    ).returning(DeviceToken.created_at)
+    created_at = db.execute(stmt).scalar_one()
     db.commit()
 
+    if created_at != now:
+        return {"message": "Device token updated"}
     return {"message": "Device registered successfully"}
 
 
 @router.delete("/device")
-async def unregister_device(
+def unregister_device(
     request: DeviceRegistration,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -90,50 +86,38 @@ async def unregister_device(
 
 
 @router.get("/preferences", response_model=NotificationPreferencesResponse)
-async def get_preferences(
+def get_preferences(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get notification preferences for current user."""
-    prefs = db.query(NotificationPreference).filter(
-        NotificationPreference.user_id == current_user.id
-    ).first()
+    prefs = current_user.notification_preferences
 
     if not prefs:
         # Return defaults
-        return NotificationPreferencesResponse(
+        return NotificationPreferencesResponse.model_construct(
             deadline_reminders=True,
             application_updates=True,
             new_grant_alerts=False,
             reminder_days_before=[7, 3, 1]
         )
 
-    # Parse JSON for reminder_days_before
-    days = [7, 3, 1]
-    if prefs.reminder_days_before:
-        try:
-            days = json.loads(prefs.reminder_days_before)
-        except json.JSONDecodeError:
-            pass
-
-    return NotificationPreferencesResponse(
+    return NotificationPreferencesResponse.model_construct(
         deadline_reminders=prefs.deadline_reminders,
         application_updates=prefs.application_updates,
         new_grant_alerts=prefs.new_grant_alerts,
-        reminder_days_before=days
+        reminder_days_before=prefs.reminder_days_before if prefs.reminder_days_before is not None else [7, 3, 1]
     )
 
 
 @router.patch("/preferences", response_model=NotificationPreferencesResponse)
-async def update_preferences(
+def update_preferences(
     request: NotificationPreferencesRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update notification preferences for current user."""
-    prefs = db.query(NotificationPreference).filter(
-        NotificationPreference.user_id == current_user.id
-    ).first()
+    prefs = current_user.notification_preferences
 
     if not prefs:
         prefs = NotificationPreference(user_id=current_user.id)
@@ -142,13 +126,12 @@ async def update_preferences(
     prefs.deadline_reminders = request.deadline_reminders
     prefs.application_updates = request.application_updates
     prefs.new_grant_alerts = request.new_grant_alerts
-    prefs.reminder_days_before = json.dumps(request.reminder_days_before)
+    prefs.reminder_days_before = request.reminder_days_before
     prefs.updated_at = datetime.utcnow()
 
     db.commit()
-    db.refresh(prefs)
 
-    return NotificationPreferencesResponse(
+    return NotificationPreferencesResponse.model_construct(
         deadline_reminders=prefs.deadline_reminders,
         application_updates=prefs.application_updates,
         new_grant_alerts=prefs.new_grant_alerts,
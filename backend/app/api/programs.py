@@ -1,16 +1,49 @@
 """Grant programs API."""
-from typing import List, Optional
-import io
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
+from operator import attrgetter
+import hashlib
+import threading
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
+from sqlalchemy import Row, func, insert, text
 from sqlalchemy.orm import Session
 
-from app.models.database import get_db, GrantProgram, GrantCategory
-from app.services.pdf_generator import generate_grant_summary_pdf
+from app.models.database import (
+    get_db, dialect_insert, utcnow, SessionLocal, GrantProgram, GrantCategory, PROGRAM_SEARCH_DOCUMENT
+)
+from app.services.pdf_generator import PROGRAM_PDF_FIELDS, render_grant_summary_pdf
 
 router = APIRouter(prefix="/api/programs", tags=["Grant Programs"])
 
+# Program rows are near-static; keep detached copies so lookups by id skip the DB.
+_program_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_program_cache_lock = threading.Lock()
+
+# Rendered summary PDFs, keyed by the date (printed on the PDF) and every field
+# the PDF shows, so an edited program never serves a stale document.
+_program_pdf_cache: TTLCache = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+_program_pdf_fields = attrgetter(*PROGRAM_PDF_FIELDS)
+
+# GrantCategory is fixed at runtime, so the categories payload is encoded once
+CATEGORIES_JSON = orjson.dumps({
+    "categories": [
+        {"id": c.value, "name": c.value.replace("_", " ").title()}
+        for c in GrantCategory
+    ]
+})
+
+# The list endpoint only needs these, so it skips loading full ORM entities
+PROGRAM_RESPONSE_COLUMNS = (
+    GrantProgram.id, GrantProgram.name, GrantProgram.agency, GrantProgram.category,
+    GrantProgram.min_award, GrantProgram.max_award, GrantProgram.match_required,
+    GrantProgram.description, GrantProgram.eligibility_summary,
+    GrantProgram.deadline, GrantProgram.rolling_deadline, GrantProgram.program_url,
+)
+
 
 # ============ Schemas ============
 
@@ -24,7 +57,7 @@ class ProgramResponse(BaseModel):
     match_required: Optional[float]
     description: Optional[str]
     eligibility_summary: Optional[str]
-    deadline: Optional[str]
+    deadline: Optional[datetime]
     rolling_deadline: bool
     program_url: Optional[str]
 
@@ -39,29 +72,264 @@ class ProgramListResponse(BaseModel):
 
 # ============ Helpers ============
 
-def build_program_response(p: GrantProgram) -> ProgramResponse:
-    """Build ProgramResponse from GrantProgram model."""
-    return ProgramResponse(
+def build_program_response(p: Union[GrantProgram, Row]) -> ProgramResponse:
+    """Build ProgramResponse from a GrantProgram or list row (trusted, so unvalidated)."""
+    return ProgramResponse.model_construct(
         id=p.id, name=p.name, agency=p.agency,
         category=p.category.value if p.category else None,
         min_award=p.min_award, max_award=p.max_award, match_required=p.match_required,
         description=p.description, eligibility_summary=p.eligibility_summary,
-        deadline=p.deadline.isoformat() if p.deadline else None,
+        deadline=p.deadline,
         rolling_deadline=p.rolling_deadline, program_url=p.program_url
     )
 
 
+def get_program_by_id(db: Session, program_id: str) -> Optional[GrantProgram]:
+    """Look up a program by id, served from the in-process cache when possible."""
+    with _program_cache_lock:
+        cached = _program_cache.get(program_id)
+    if cached is None:
+        cached = db.query(GrantProgram).filter(GrantProgram.id == program_id).first()
+        if cached is None:
+            return None
+        db.expunge(cached)
+        with _program_cache_lock:
+            _program_cache[program_id] = cached
+    # Attach a session-local copy without emitting a SELECT
+    return db.merge(cached, load=False)
+
+
+def get_program_pdf(program: GrantProgram) -> Tuple[bytes, str]:
+    """Return the program's summary PDF and its ETag, rendering only on a cache miss."""
+    key = (date.today(), *_program_pdf_fields(program))
+    with _program_cache_lock:
+        cached = _program_pdf_cache.get(key)
+    if cached is None:
+        pdf = render_grant_summary_pdf(program)
+        cached = (pdf, f'"{hashlib.sha256(pdf).hexdigest()[:16]}"')
+        with _program_cache_lock:
+            _program_pdf_cache[key] = cached
+    return cached
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the values a response depends on."""
+    return f'W/"{hashlib.sha256(repr(parts).encode()).hexdigest()[:16]}"'
+
+
+def clear_program_cache() -> None:
+    """Forget cached programs (call after writing to grant_programs)."""
+    with _program_cache_lock:
+        _program_cache.clear()
+        _program_pdf_cache.clear()
+
+
+def bulk_upsert_programs(db: Session, rows: List[dict]) -> int:
+    """Insert programs, or update the ones whose id already exists, in one batched statement."""
+    if not rows:
+        return 0
+    stmt = dialect_insert(db, GrantProgram)
+    columns = {key for row in rows for key in row} - {"id"}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={**{column: stmt.excluded[column] for column in columns}, "updated_at": utcnow()},
+    )
+    db.execute(stmt, rows)
+    clear_program_cache()
+    return len(rows)
+
+
+def seed_programs_from_file(path: str) -> int:
+    """Upsert the programs in a JSON seed file (a list of SAMPLE_PROGRAMS-style objects)."""
+    with open(path, "rb") as f:
+        programs = orjson.loads(f.read())
+    now = datetime.now()
+    rows = []
+    for data in programs:
+        row = sample_program_row(data, now)
+        if row.get("category") is not None:
+            row["category"] = GrantCategory(row["category"])
+        if isinstance(row.get("deadline"), str):
+            row["deadline"] = datetime.fromisoformat(row["deadline"])
+        rows.append(row)
+
+    db = SessionLocal()
+    try:
+        count = bulk_upsert_programs(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    return count
+
+
+# ============ Seed Data ============
+
+# Deadlines are stored as days from seeding time ("deadline_days")
+SAMPLE_PROGRAMS = (
+    # Small Business
+    {"id": "sba_7a", "name": "SBA 7(a) Loan Program", "agency": "Small Business Administration",
+     "category": GrantCategory.SMALL_BUSINESS, "min_award": 5000, "max_award": 5000000,
+     "description": "The 7(a) loan program is the SBA's primary program for providing financial assistance to small businesses.",
+     "eligibility_summary": "Must be a for-profit business operating in the US, meet SBA size standards.",
+     "rolling_deadline": True, "program_url": "https://www.sba.gov/funding-programs/loans/7a-loans", "is_active": True},
+    {"id": "sba_microloan", "name": "SBA Microloan Program", "agency": "Small Business Administration",
+     "category": GrantCategory.SMALL_BUSINESS, "min_award": 500, "max_award": 50000,
+     "description": "Provides small, short-term loans to small businesses and certain nonprofit childcare centers.",
+     "eligibility_summary": "Must be a small business or nonprofit childcare center. Startups eligible.",
+     "rolling_deadline": True, "program_url": "https://www.sba.gov/funding-programs/loans/microloans", "is_active": True},
+    {"id": "sbir_phase1", "name": "Small Business Innovation Research (SBIR) Phase I", "agency": "National Science Foundation",
+     "category": GrantCategory.SMALL_BUSINESS, "min_award": 50000, "max_award": 275000,
+     "description": "Funding for small businesses to conduct R&D with commercial potential.",
+     "eligibility_summary": "US small business with fewer than 500 employees.",
+     "deadline_days": 65, "rolling_deadline": False,
+     "program_url": "https://www.sbir.gov/", "is_active": True},
+
+    # Healthcare
+    {"id": "hrsa_rural_health", "name": "Rural Health Clinic Grant Program", "agency": "HRSA",
+     "category": GrantCategory.HEALTHCARE, "min_award": 25000, "max_award": 200000,
+     "description": "Supports rural health clinics in improving quality of care and expanding services.",
+     "eligibility_summary": "Must be a certified Rural Health Clinic in a designated rural area.",
+     "deadline_days": 60, "rolling_deadline": False,
+     "program_url": "https://www.hrsa.gov/rural-health", "is_active": True},
+    {"id": "hrsa_community_health", "name": "Community Health Center Expansion", "agency": "HRSA",
+     "category": GrantCategory.HEALTHCARE, "min_award": 100000, "max_award": 1000000,
+     "description": "Funding to expand access to comprehensive primary health care services in underserved communities.",
+     "eligibility_summary": "Must be a Federally Qualified Health Center (FQHC).",
+     "deadline_days": 120, "rolling_deadline": False,
+     "program_url": "https://www.hrsa.gov/grants/find-funding", "is_active": True},
+    {"id": "cdc_preventive", "name": "Preventive Health Services Block Grant", "agency": "CDC",
+     "category": GrantCategory.HEALTHCARE, "min_award": 50000, "max_award": 500000, "match_required": 0.25,
+     "description": "Provides funding to address gaps in health services at the community level.",
+     "eligibility_summary": "State/local health departments, tribal organizations, community health centers.",
+     "rolling_deadline": True, "program_url": "https://www.cdc.gov/phhsblockgrant/", "is_active": True},
+
+    # Education
+    {"id": "pell_grant", "name": "Federal Pell Grant", "agency": "Department of Education",
+     "category": GrantCategory.EDUCATION, "min_award": 750, "max_award": 7395,
+     "description": "Need-based grants for undergraduate students pursuing their first bachelor's degree.",
+     "eligibility_summary": "Must demonstrate exceptional financial need, be a US citizen or eligible noncitizen.",
+     "rolling_deadline": True, "program_url": "https://studentaid.gov/understand-aid/types/grants/pell", "is_active": True},
+    {"id": "teach_grant", "name": "TEACH Grant", "agency": "Department of Education",
+     "category": GrantCategory.EDUCATION, "min_award": 1000, "max_award": 4000,
+     "description": "Grants for students who intend to teach in high-need fields at schools serving low-income students.",
+     "eligibility_summary": "Must maintain 3.25 GPA and agree to teach for 4 years in a high-need field.",
+     "rolling_deadline": True, "program_url": "https://studentaid.gov/understand-aid/types/grants/teach", "is_active": True},
+    {"id": "fulbright", "name": "Fulbright U.S. Student Program", "agency": "State Department",
+     "category": GrantCategory.EDUCATION, "min_award": 15000, "max_award": 50000,
+     "description": "Scholarships for U.S. students to study, teach, or conduct research abroad.",
+     "eligibility_summary": "U.S. citizens with a bachelor's degree by the start of the grant.",
+     "deadline_days": 180, "rolling_deadline": False,
+     "program_url": "https://us.fulbrightonline.org/", "is_active": True},
+
+    # Nonprofit
+    {"id": "americorps_state", "name": "AmeriCorps State and National Grants", "agency": "CNCS",
+     "category": GrantCategory.NONPROFIT, "min_award": 100000, "max_award": 1500000, "match_required": 0.24,
+     "description": "Supports organizations engaging AmeriCorps members in evidence-based interventions.",
+     "eligibility_summary": "Nonprofit organizations, higher education institutions, state/local governments.",
+     "deadline_days": 45, "rolling_deadline": False,
+     "program_url": "https://americorps.gov/funding-opportunity", "is_active": True},
+    {"id": "neh_humanities", "name": "NEH Humanities Connections Planning Grants", "agency": "NEH",
+     "category": GrantCategory.NONPROFIT, "min_award": 25000, "max_award": 50000,
+     "description": "Supports planning of programs that integrate humanities into STEM and career education.",
+     "eligibility_summary": "Accredited colleges, universities, and nonprofit cultural organizations.",
+     "deadline_days": 100, "rolling_deadline": False,
+     "program_url": "https://www.neh.gov/grants", "is_active": True},
+    {"id": "fema_bric", "name": "Building Resilient Infrastructure and Communities", "agency": "FEMA",
+     "category": GrantCategory.NONPROFIT, "min_award": 75000, "max_award": 50000000, "match_required": 0.25,
+     "description": "Supports pre-disaster mitigation projects for communities.",
+     "eligibility_summary": "State, local, tribal governments, and nonprofits in declared disaster areas.",
+     "deadline_days": 150, "rolling_deadline": False,
+     "program_url": "https://www.fema.gov/grants/mitigation/building-resilient-infrastructure-communities", "is_active": True},
+
+    # Agriculture
+    {"id": "usda_value_added", "name": "Value-Added Producer Grant", "agency": "USDA Rural Development",
+     "category": GrantCategory.AGRICULTURE, "min_award": 10000, "max_award": 250000, "match_required": 0.5,
+     "description": "Helps agricultural producers enter value-added activities and develop new products.",
+     "eligibility_summary": "Independent agricultural producers, farmer cooperatives.",
+     "deadline_days": 80, "rolling_deadline": False,
+     "program_url": "https://www.rd.usda.gov/programs-services/business-programs/value-added-producer-grants", "is_active": True},
+    {"id": "usda_beginning_farmer", "name": "Beginning Farmer and Rancher Loan", "agency": "USDA FSA",
+     "category": GrantCategory.AGRICULTURE, "min_award": 5000, "max_award": 600000,
+     "description": "Low-interest loans for beginning farmers who cannot obtain commercial credit.",
+     "eligibility_summary": "Must have operated a farm for less than 10 years.",
+     "rolling_deadline": True, "program_url": "https://www.fsa.usda.gov/programs-and-services/farm-loan-programs", "is_active": True},
+    {"id": "usda_specialty_crop", "name": "Specialty Crop Block Grant Program", "agency": "USDA AMS",
+     "category": GrantCategory.AGRICULTURE, "min_award": 10000, "max_award": 500000,
+     "description": "Enhances competitiveness of specialty crops including fruits, vegetables, nursery crops.",
+     "eligibility_summary": "State departments of agriculture distributing funds to specialty crop producers.",
+     "deadline_days": 120, "rolling_deadline": False,
+     "program_url": "https://www.ams.usda.gov/services/grants/scbgp", "is_active": True},
+
+    # Technology
+    {"id": "nsf_sttr", "name": "NSF Small Business Technology Transfer (STTR)", "agency": "NSF",
+     "category": GrantCategory.TECHNOLOGY, "min_award": 50000, "max_award": 300000,
+     "description": "Funds collaborative research between small businesses and research institutions.",
+     "eligibility_summary": "US small businesses partnered with nonprofit research institutions.",
+     "deadline_days": 80, "rolling_deadline": False,
+     "program_url": "https://seedfund.nsf.gov/", "is_active": True},
+    {"id": "doe_arpa_e", "name": "ARPA-E Exploratory Topics", "agency": "DOE",
+     "category": GrantCategory.TECHNOLOGY, "min_award": 250000, "max_award": 5000000, "match_required": 0.2,
+     "description": "Funds transformational energy technologies too early for private-sector investment.",
+     "eligibility_summary": "Universities, national labs, businesses of all sizes, nonprofits.",
+     "deadline_days": 45, "rolling_deadline": False,
+     "program_url": "https://arpa-e.energy.gov/", "is_active": True},
+    {"id": "ntia_broadband", "name": "Broadband Equity, Access, and Deployment (BEAD)", "agency": "NTIA",
+     "category": GrantCategory.TECHNOLOGY, "min_award": 100000, "max_award": 100000000, "match_required": 0.25,
+     "description": "Funds broadband infrastructure deployment to unserved and underserved areas.",
+     "eligibility_summary": "State broadband offices, municipalities, cooperatives, and ISPs.",
+     "deadline_days": 200, "rolling_deadline": False,
+     "program_url": "https://broadbandusa.ntia.doc.gov/funding-programs", "is_active": True},
+
+    # Housing
+    {"id": "hud_cdbg", "name": "Community Development Block Grant (CDBG)", "agency": "HUD",
+     "category": GrantCategory.HOUSING, "min_award": 100000, "max_award": 3000000,
+     "description": "Provides resources to address housing and community development needs.",
+     "eligibility_summary": "Cities, counties, and states. 70% must benefit low/moderate-income persons.",
+     "rolling_deadline": True, "program_url": "https://www.hud.gov/program_offices/comm_planning/cdbg", "is_active": True},
+    {"id": "hud_home", "name": "HOME Investment Partnerships Program", "agency": "HUD",
+     "category": GrantCategory.HOUSING, "min_award": 50000, "max_award": 5000000, "match_required": 0.25,
+     "description": "Formula grants for affordable housing activities.",
+     "eligibility_summary": "State and local governments (participating jurisdictions).",
+     "rolling_deadline": True, "program_url": "https://www.hud.gov/program_offices/comm_planning/home", "is_active": True},
+    {"id": "usda_rural_housing", "name": "USDA Section 502 Direct Loan Program", "agency": "USDA",
+     "category": GrantCategory.HOUSING, "min_award": 20000, "max_award": 400000,
+     "description": "Payment assistance to low and very-low income homebuyers in rural areas.",
+     "eligibility_summary": "Low-income individuals in eligible rural areas without decent housing.",
+     "rolling_deadline": True, "program_url": "https://www.rd.usda.gov/programs-services/single-family-housing-programs", "is_active": True},
+)
+
+
+def sample_program_row(data: dict, now: datetime) -> dict:
+    """Turn a SAMPLE_PROGRAMS entry into insert values, resolving deadline_days."""
+    row = dict(data)
+    days = row.pop("deadline_days", None)
+    if days is not None:
+        row["deadline"] = now + timedelta(days=days)
+    return row
+
+
 # ============ Endpoints ============
 
 @router.get("/", response_model=ProgramListResponse)
-async def list_programs(
+def list_programs(
+    request: Request,
+    response: Response,
     category: Optional[GrantCategory] = None,
     search: Optional[str] = None,
     active_only: bool = True,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
-    """List available grant programs."""
-    query = db.query(GrantProgram)
+    """List available grant programs, a page at a time."""
+    # Cheap probe first: an unchanged catalogue answers 304 without building the page
+    latest, count = db.query(func.max(GrantProgram.updated_at), func.count(GrantProgram.id)).one()
+    etag = make_etag(latest, count, category, search, active_only, limit, offset)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    query = db.query(*PROGRAM_RESPONSE_COLUMNS)
 
     if active_only:
         query = query.filter(GrantProgram.is_active.is_(True))
@@ -70,218 +338,83 @@ async def list_programs(
         query = query.filter(GrantProgram.category == category)
 
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            GrantProgram.name.ilike(search_term) |
-            GrantProgram.description.ilike(search_term)
-        )
-
-    programs = query.order_by(GrantProgram.name).all()
-    return ProgramListResponse(
-        total=len(programs), programs=[build_program_response(p) for p in programs]
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.filter(text(
+                f"{PROGRAM_SEARCH_DOCUMENT} @@ plainto_tsquery('english', :search)"
+            ).bindparams(search=search))
+        else:
+            search_term = f"%{search}%"
+            query = query.filter(
+                GrantProgram.name.ilike(search_term) |
+                GrantProgram.description.ilike(search_term)
+            )
+
+    # The window count rides along with the page, so one query gives both
+    programs = query.add_columns(func.count().over().label("total")).order_by(
+        GrantProgram.name
+    ).limit(limit).offset(offset).all()
+    total = programs[0].total if programs else query.count()
+    return ProgramListResponse.model_construct(
+        total=total, programs=[build_program_response(p) for p in programs]
     )
 
 
 @router.get("/categories")
 async def list_categories():
     """List all grant categories."""
-    return {
-        "categories": [
-            {"id": c.value, "name": c.value.replace("_", " ").title()}
-            for c in GrantCategory
-        ]
-    }
+    return Response(CATEGORIES_JSON, media_type="application/json")
 
 
 @router.get("/{program_id}", response_model=ProgramResponse)
-async def get_program(program_id: str, db: Session = Depends(get_db)):
+def get_program(program_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific program by ID."""
-    program = db.query(GrantProgram).filter(GrantProgram.id == program_id).first()
+    program = get_program_by_id(db, program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
+
+    etag = make_etag(program.id, program.updated_at)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return build_program_response(program)
 
 
 @router.get("/{program_id}/pdf")
-async def download_program_pdf(program_id: str, db: Session = Depends(get_db)):
+def download_program_pdf(program_id: str, request: Request, db: Session = Depends(get_db)):
     """Download grant program summary as PDF."""
-    program = db.query(GrantProgram).filter(GrantProgram.id == program_id).first()
+    program = get_program_by_id(db, program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
 
-    program_data = {
-        "id": program.id,
-        "name": program.name,
-        "agency": program.agency,
-        "category": program.category.value if program.category else None,
-        "description": program.description,
-        "eligibility_summary": program.eligibility_summary,
-        "min_award": program.min_award,
-        "max_award": program.max_award,
-        "match_required": program.match_required,
-        "deadline": program.deadline.isoformat() if program.deadline else None,
-        "rolling_deadline": program.rolling_deadline,
-        "program_url": program.program_url,
-    }
-
-    pdf_buffer = generate_grant_summary_pdf(program_data)
+    pdf_buffer, etag = get_program_pdf(program)
+    cache_headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
 
+    # Already fully in memory: send it as one body (Response sets Content-Length)
     filename = f"grant_{program.id}.pdf"
-    return StreamingResponse(
-        io.BytesIO(pdf_buffer),
+    return Response(
+        content=pdf_buffer,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', **cache_headers}
     )
 
 
 @router.post("/seed")
-async def seed_programs(db: Session = Depends(get_db)):
+def seed_programs(db: Session = Depends(get_db)):
     """Seed database with sample grant programs."""
-    from datetime import datetime, timedelta
-
-    # Check if already seeded
-    existing = db.query(GrantProgram).count()
-    if existing > 0:
+    # Check if already seeded (EXISTS probe; only count when there is something to report)
+    if db.query(db.query(GrantProgram).exists()).scalar():
+        existing = db.query(func.count(GrantProgram.id)).scalar()
         return {"message": f"Database already has {existing} programs", "seeded": 0}
 
-    SAMPLE_PROGRAMS = [
-        # Small Business
-        {"id": "sba_7a", "name": "SBA 7(a) Loan Program", "agency": "Small Business Administration",
-         "category": GrantCategory.SMALL_BUSINESS, "min_award": 5000, "max_award": 5000000,
-         "description": "The 7(a) loan program is the SBA's primary program for providing financial assistance to small businesses.",
-         "eligibility_summary": "Must be a for-profit business operating in the US, meet SBA size standards.",
-         "rolling_deadline": True, "program_url": "https://www.sba.gov/funding-programs/loans/7a-loans", "is_active": True},
-        {"id": "sba_microloan", "name": "SBA Microloan Program", "agency": "Small Business Administration",
-         "category": GrantCategory.SMALL_BUSINESS, "min_award": 500, "max_award": 50000,
-         "description": "Provides small, short-term loans to small businesses and certain nonprofit childcare centers.",
-         "eligibility_summary": "Must be a small business or nonprofit childcare center. Startups eligible.",
-         "rolling_deadline": True, "program_url": "https://www.sba.gov/funding-programs/loans/microloans", "is_active": True},
-        {"id": "sbir_phase1", "name": "Small Business Innovation Research (SBIR) Phase I", "agency": "National Science Foundation",
-         "category": GrantCategory.SMALL_BUSINESS, "min_award": 50000, "max_award": 275000,
-         "description": "Funding for small businesses to conduct R&D with commercial potential.",
-         "eligibility_summary": "US small business with fewer than 500 employees.",
-         "deadline": datetime.now() + timedelta(days=65), "rolling_deadline": False,
-         "program_url": "https://www.sbir.gov/", "is_active": True},
-
-        # Healthcare
-        {"id": "hrsa_rural_health", "name": "Rural Health Clinic Grant Program", "agency": "HRSA",
-         "category": GrantCategory.HEALTHCARE, "min_award": 25000, "max_award": 200000,
-         "description": "Supports rural health clinics in improving quality of care and expanding services.",
-         "eligibility_summary": "Must be a certified Rural Health Clinic in a designated rural area.",
-         "deadline": datetime.now() + timedelta(days=60), "rolling_deadline": False,
-         "program_url": "https://www.hrsa.gov/rural-health", "is_active": True},
-        {"id": "hrsa_community_health", "name": "Community Health Center Expansion", "agency": "HRSA",
-         "category": GrantCategory.HEALTHCARE, "min_award": 100000, "max_award": 1000000,
-         "description": "Funding to expand access to comprehensive primary health care services in underserved communities.",
-         "eligibility_summary": "Must be a Federally Qualified Health Center (FQHC).",
-         "deadline": datetime.now() + timedelta(days=120), "rolling_deadline": False,
-         "program_url": "https://www.hrsa.gov/grants/find-funding", "is_active": True},
-        {"id": "cdc_preventive", "name": "Preventive Health Services Block Grant", "agency": "CDC",
-         "category": GrantCategory.HEALTHCARE, "min_award": 50000, "max_award": 500000, "match_required": 0.25,
-         "description": "Provides funding to address gaps in health services at the community level.",
-         "eligibility_summary": "State/local health departments, tribal organizations, community health centers.",
-         "rolling_deadline": True, "program_url": "https://www.cdc.gov/phhsblockgrant/", "is_active": True},
-
-        # Education
-        {"id": "pell_grant", "name": "Federal Pell Grant", "agency": "Department of Education",
-         "category": GrantCategory.EDUCATION, "min_award": 750, "max_award": 7395,
-         "description": "Need-based grants for undergraduate students pursuing their first bachelor's degree.",
-         "eligibility_summary": "Must demonstrate exceptional financial need, be a US citizen or eligible noncitizen.",
-         "rolling_deadline": True, "program_url": "https://studentaid.gov/understand-aid/types/grants/pell", "is_active": True},
-        {"id": "teach_grant", "name": "TEACH Grant", "agency": "Department of Education",
-         "category": GrantCategory.EDUCATION, "min_award": 1000, "max_award": 4000,
-         "description": "Grants for students who intend to teach in high-need fields at schools serving low-income students.",
-         "eligibility_summary": "Must maintain 3.25 GPA and agree to teach for 4 years in a high-need field.",
-         "rolling_deadline": True, "program_url": "https://studentaid.gov/understand-aid/types/grants/teach", "is_active": True},
-        {"id": "fulbright", "name": "Fulbright U.S. Student Program", "agency": "State Department",
-         "category": GrantCategory.EDUCATION, "min_award": 15000, "max_award": 50000,
-         "description": "Scholarships for U.S. students to study, teach, or conduct research abroad.",
-         "eligibility_summary": "U.S. citizens with a bachelor's degree by the start of the grant.",
-         "deadline": datetime.now() + timedelta(days=180), "rolling_deadline": False,
-         "program_url": "https://us.fulbrightonline.org/", "is_active": True},
-
-        # Nonprofit
-        {"id": "americorps_state", "name": "AmeriCorps State and National Grants", "agency": "CNCS",
-         "category": GrantCategory.NONPROFIT, "min_award": 100000, "max_award": 1500000, "match_required": 0.24,
-         "description": "Supports organizations engaging AmeriCorps members in evidence-based interventions.",
-         "eligibility_summary": "Nonprofit organizations, higher education institutions, state/local governments.",
-         "deadline": datetime.now() + timedelta(days=45), "rolling_deadline": False,
-         "program_url": "https://americorps.gov/funding-opportunity", "is_active": True},
-        {"id": "neh_humanities", "name": "NEH Humanities Connections Planning Grants", "agency": "NEH",
-         "category": GrantCategory.NONPROFIT, "min_award": 25000, "max_award": 50000,
-         "description": "Supports planning of programs that integrate humanities into STEM and career education.",
-         "eligibility_summary": "Accredited colleges, universities, and nonprofit cultural organizations.",
-         "deadline": datetime.now() + timedelta(days=100), "rolling_deadline": False,
-         "program_url": "https://www.neh.gov/grants", "is_active": True},
-        {"id": "fema_bric", "name": "Building Resilient Infrastructure and Communities", "agency": "FEMA",
-         "category": GrantCategory.NONPROFIT, "min_award": 75000, "max_award": 50000000, "match_required": 0.25,
-         "description": "Supports pre-disaster mitigation projects for communities.",
-         "eligibility_summary": "State, local, tribal governments, and nonprofits in declared disaster areas.",
-         "deadline": datetime.now() + timedelta(days=150), "rolling_deadline": False,
-         "program_url": "https://www.fema.gov/grants/mitigation/building-resilient-infrastructure-communities", "is_active": True},
-
-        # Agriculture
-        {"id": "usda_value_added", "name": "Value-Added Producer Grant", "agency": "USDA Rural Development",
-         "category": GrantCategory.AGRICULTURE, "min_award": 10000, "max_award": 250000, "match_required": 0.5,
-         "description": "Helps agricultural producers enter value-added activities and develop new products.",
-         "eligibility_summary": "Independent agricultural producers, farmer cooperatives.",
-         "deadline": datetime.now() + timedelta(days=80), "rolling_deadline": False,
-         "program_url": "https://www.rd.usda.gov/programs-services/business-programs/value-added-producer-grants", "is_active": True},
-        {"id": "usda_beginning_farmer", "name": "Beginning Farmer and Rancher Loan", "agency": "USDA FSA",
-         "category": GrantCategory.AGRICULTURE, "min_award": 5000, "max_award": 600000,
-         "description": "Low-interest loans for beginning farmers who cannot obtain commercial credit.",
-         "eligibility_summary": "Must have operated a farm for less than 10 years.",
-         "rolling_deadline": True, "program_url": "https://www.fsa.usda.gov/programs-and-services/farm-loan-programs", "is_active": True},
-        {"id": "usda_specialty_crop", "name": "Specialty Crop Block Grant Program", "agency": "USDA AMS",
-         "category": GrantCategory.AGRICULTURE, "min_award": 10000, "max_award": 500000,
-         "description": "Enhances competitiveness of specialty crops including fruits, vegetables, nursery crops.",
-         "eligibility_summary": "State departments of agriculture distributing funds to specialty crop producers.",
-         "deadline": datetime.now() + timedelta(days=120), "rolling_deadline": False,
-         "program_url": "https://www.ams.usda.gov/services/grants/scbgp", "is_active": True},
-
-        # Technology
-        {"id": "nsf_sttr", "name": "NSF Small Business Technology Transfer (STTR)", "agency": "NSF",
-         "category": GrantCategory.TECHNOLOGY, "min_award": 50000, "max_award": 300000,
-         "description": "Funds collaborative research between small businesses and research institutions.",
-         "eligibility_summary": "US small businesses partnered with nonprofit research institutions.",
-         "deadline": datetime.now() + timedelta(days=80), "rolling_deadline": False,
-         "program_url": "https://seedfund.nsf.gov/", "is_active": True},
-        {"id": "doe_arpa_e", "name": "ARPA-E Exploratory Topics", "agency": "DOE",
-         "category": GrantCategory.TECHNOLOGY, "min_award": 250000, "max_award": 5000000, "match_required": 0.2,
-         "description": "Funds transformational energy technologies too early for private-sector investment.",
-         "eligibility_summary": "Universities, national labs, businesses of all sizes, nonprofits.",
-         "deadline": datetime.now() + timedelta(days=45), "rolling_deadline": False,
-         "program_url": "https://arpa-e.energy.gov/", "is_active": True},
-        {"id": "ntia_broadband", "name": "Broadband Equity, Access, and Deployment (BEAD)", "agency": "NTIA",
-         "category": GrantCategory.TECHNOLOGY, "min_award": 100000, "max_award": 100000000, "match_required": 0.25,
-         "description": "Funds broadband infrastructure deployment to unserved and underserved areas.",
-         "eligibility_summary": "State broadband offices, municipalities, cooperatives, and ISPs.",
-         "deadline": datetime.now() + timedelta(days=200), "rolling_deadline": False,
-         "program_url": "https://broadbandusa.ntia.doc.gov/funding-programs", "is_active": True},
-
-        # Housing
-        {"id": "hud_cdbg", "name": "Community Development Block Grant (CDBG)", "agency": "HUD",
-         "category": GrantCategory.HOUSING, "min_award": 100000, "max_award": 3000000,
-         "description": "Provides resources to address housing and community development needs.",
-         "eligibility_summary": "Cities, counties, and states. 70% must benefit low/moderate-income persons.",
-         "rolling_deadline": True, "program_url": "https://www.hud.gov/program_offices/comm_planning/cdbg", "is_active": True},
-        {"id": "hud_home", "name": "HOME Investment Partnerships Program", "agency": "HUD",
-         "category": GrantCategory.HOUSING, "min_award": 50000, "max_award": 5000000, "match_required": 0.25,
-         "description": "Formula grants for affordable housing activities.",
-         "eligibility_summary": "State and local governments (participating jurisdictions).",
-         "rolling_deadline": True, "program_url": "https://www.hud.gov/program_offices/comm_planning/home", "is_active": True},
-        {"id": "usda_rural_housing", "name": "USDA Section 502 Direct Loan Program", "agency": "USDA",
-         "category": GrantCategory.HOUSING, "min_award": 20000, "max_award": 400000,
-         "description": "Payment assistance to low and very-low income homebuyers in rural areas.",
-         "eligibility_summary": "Low-income individuals in eligible rural areas without decent housing.",
-         "rolling_deadline": True, "program_url": "https://www.rd.usda.gov/programs-services/single-family-housing-programs", "is_active": True},
-    ]
+    now = datetime.now()
+    rows = [sample_program_row(data, now) for data in SAMPLE_PROGRAMS]
 
-    added = 0
-    for data in SAMPLE_PROGRAMS:
-        program = GrantProgram(**data)
-        db.add(program)
-        added += 1
+    # One executemany instead of a unit-of-work pass per program
+    db.execute(insert(GrantProgram), rows)
+    added = len(rows)
 
     db.commit()
+    clear_program_cache()
     return {"message": f"Successfully seeded {added} grant programs", "seeded": added}
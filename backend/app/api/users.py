@@ -1,4 +1,5 @@
 """User profile API."""
+from operator import attrgetter
 from typing import Optional
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
@@ -6,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.models.database import get_db, User, UserProfile
 from app.api.auth import get_current_user
+from app.api.eligibility import invalidate_eligibility_cache
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -56,12 +58,18 @@ class ProfileResponse(BaseModel):
 
 # ============ Helpers ============
 
+# Fields that count towards profile completeness, fetched in one C-level call
+COMPLETENESS_FIELDS = (
+    "full_name", "organization_name", "address", "city", "state",
+    "zip_code", "phone", "ein", "uei_number",
+)
+_completeness_values = attrgetter(*COMPLETENESS_FIELDS)
+_COMPLETENESS_PCT_PER_FIELD = 100.0 / len(COMPLETENESS_FIELDS)
+
+
 def calculate_profile_completeness(profile: UserProfile) -> float:
     """Calculate how complete a profile is."""
-    fields = [profile.full_name, profile.organization_name, profile.address,
-              profile.city, profile.state, profile.zip_code, profile.phone,
-              profile.ein, profile.uei_number]
-    return round((sum(1 for f in fields if f) / len(fields)) * 100, 1)
+    return round(sum(map(bool, _completeness_values(profile))) * _COMPLETENESS_PCT_PER_FIELD, 1)
 
 
 def build_profile_response(profile: UserProfile) -> ProfileResponse:
@@ -80,39 +88,46 @@ def build_profile_response(profile: UserProfile) -> ProfileResponse:
 # ============ Endpoints ============
 
 @router.get("/profile", response_model=ProfileResponse)
-async def get_profile(
+def get_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get current user's profile."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    profile = current_user.profile
 
     if not profile:
         # Create empty profile
         profile = UserProfile(user_id=current_user.id)
         db.add(profile)
         db.commit()
-        db.refresh(profile)
 
     return build_profile_response(profile)
 
 
 @router.patch("/profile", response_model=ProfileResponse)
-async def update_profile(
+def update_profile(
     updates: ProfileUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update user profile."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    profile = current_user.profile
+    created = profile is None
 
-    if not profile:
+    if created:
         profile = UserProfile(user_id=current_user.id)
         db.add(profile)
 
+    changed = False
     for field, value in updates.model_dump(exclude_unset=True).items():
-        setattr(profile, field, value)
+        if getattr(profile, field) != value:
+            setattr(profile, field, value)
+            changed = True
+
+    # Retried or no-op PATCHes skip the commit and keep cached eligibility
+    if not (created or changed):
+        return build_profile_response(profile)
 
     db.commit()
-    db.refresh(profile)
+    invalidate_eligibility_cache(current_user.id)
     return build_profile_response(profile)
@@ -1 +1 @@
-from .settings import settings as settings
+from .settings import Settings as Settings, get_settings as get_settings
@@ -1,28 +1,43 @@
 """Application settings and configuration."""
+from functools import lru_cache
 from typing import List
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment."""
 
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore", frozen=True)
+
     # App
     app_name: str = "GrantsAssist"
     debug: bool = True
 
     # Database
     database_url: str = "sqlite:///./grants_assist.db"
+    sql_echo: bool = False  # Log every SQL statement; separate from debug because it is expensive
+    # Connection pool (ignored for SQLite); size it to the worker's threadpool concurrency
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds
+    program_seed_file: str = ""  # JSON list of grant programs upserted at startup
+
+    # PDF rendering (ReportLab holds the GIL, so summaries render in worker processes)
+    pdf_workers: int = 0  # 0 = one per CPU
 
     # Auth
     secret_key: str = "change-me-in-production-use-openssl-rand-hex-32"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 1 week
+    bcrypt_rounds: int = 12  # Existing hashes are re-hashed on login when this changes
 
     # CORS
     cors_origins: List[str] = ["http://localhost:3000", "http://localhost:5173"]
 
     # External APIs
     google_api_key: str = ""
+    gemini_concurrency: int = 3  # Parallel Gemini calls per application
     census_api_key: str = ""
 
     # RevenueCat (for subscription validation)
@@ -36,8 +51,8 @@ class Settings(BaseSettings):
     apns_key_content: str = ""  # .p8 key content directly (for Railway/cloud)
     apns_use_sandbox: bool = True
 
-    class Config:
-        env_file = ".env"
-
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings are read from the environment once per process and shared."""
+    return Settings()
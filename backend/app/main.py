@@ -1,11 +1,15 @@
 """GrantsAssist API - Consumer grant application assistance platform."""
 from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 
 from app.api import auth, users, programs, applications, eligibility, notifications
-from app.config.settings import settings
-from app.models.database import init_db
+from app.config.settings import get_settings
+from app.models.database import init_db, warm_pool
+from app.services.pdf_generator import shutdown_pdf_pool
 from app.services.scheduler import start_scheduler, shutdown_scheduler
 
 VERSION = "0.1.0"
@@ -16,10 +20,15 @@ async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown."""
     print("GrantsAssist API starting...")
     init_db()
+    warm_pool()
+    seed_file = get_settings().program_seed_file
+    if seed_file and Path(seed_file).exists():
+        print(f"Seeded {programs.seed_programs_from_file(seed_file)} grant programs from {seed_file}")
     print("Database ready")
     start_scheduler()
     yield
     shutdown_scheduler()
+    shutdown_pdf_pool()
 
 
 app = FastAPI(
@@ -32,12 +41,20 @@ app = FastAPI(
 # CORS for iOS app and web
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress JSON payloads (eligibility results, application lists); PDFs are already compressed
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    compresslevel=5,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/pdf",),
+)
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(users.router)
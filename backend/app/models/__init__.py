@@ -4,9 +4,12 @@ from .database import (
     UserProfile as UserProfile,
     GrantProgram as GrantProgram,
     Application as Application,
+    DeviceToken as DeviceToken,
+    NotificationPreference as NotificationPreference,
     GrantCategory as GrantCategory,
     ApplicationStatus as ApplicationStatus,
     SubscriptionTier as SubscriptionTier,
     init_db as init_db,
+    warm_pool as warm_pool,
     get_db as get_db,
 )
@@ -1,14 +1,18 @@
 """Database models for GrantsAssist."""
 import uuid
-from datetime import datetime
 from enum import Enum
+import orjson
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, Text,
-    ForeignKey, Enum as SQLEnum, create_engine
+    BINARY, Column, String, Integer, Float, Boolean, DateTime, Text, JSON,
+    ForeignKey, Enum as SQLEnum, Index, TypeDecorator, UniqueConstraint, create_engine, text
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
 
-from app.config.settings import settings
+from app.config.settings import Settings, get_settings
 
 Base = declarative_base()
 
@@ -44,28 +48,101 @@ class SubscriptionTier(str, Enum):
     BUSINESS = "business"   # $29.99/mo - team features, priority
 
 
+# ============ Column Types ============
+
+class GUID(TypeDecorator):
+    """UUID stored natively on Postgres and as 16 raw bytes elsewhere; str in Python.
+
+    A value that isn't a UUID can never match a stored id, so it binds as NULL
+    and lookups like ``id == "nonexistent"`` simply find nothing.
+    """
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(UUID(as_uuid=False))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            parsed = value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+        except (TypeError, ValueError):
+            return None
+        return str(parsed) if dialect.name == "postgresql" else parsed.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return str(uuid.UUID(bytes=value))
+
+
+def string_enum(enum_cls) -> SQLEnum:
+    """Enum stored as its lowercase value in a short VARCHAR rather than a native type."""
+    return SQLEnum(
+        enum_cls,
+        native_enum=False,
+        length=32,
+        values_callable=lambda members: [member.value for member in members],
+    )
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+class utcnow(FunctionElement):
+    """Current UTC time computed by the database, for timestamp defaults."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    # CURRENT_TIMESTAMP is whole seconds on SQLite; keep milliseconds
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
 # ============ Models ============
 
+# Postgres full-text document for program search. The GIN index and the search
+# filter must use this exact expression for the planner to pick the index.
+PROGRAM_SEARCH_DOCUMENT = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+
 class User(Base):
     """User account - authenticated via Apple Sign-In or email."""
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID(), primary_key=True, default=new_id)
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=True)  # Null if Apple Sign-In
     apple_user_id = Column(String(255), unique=True, nullable=True)
 
     # Subscription
-    subscription_tier = Column(SQLEnum(SubscriptionTier), default=SubscriptionTier.FREE)
+    subscription_tier = Column(string_enum(SubscriptionTier), default=SubscriptionTier.FREE)
     subscription_expires_at = Column(DateTime, nullable=True)
     revenuecat_id = Column(String(255), nullable=True)
 
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     last_login_at = Column(DateTime, nullable=True)
 
     # Relationships
     profile = relationship("UserProfile", back_populates="user", uselist=False)
+    notification_preferences = relationship("NotificationPreference", back_populates="user", uselist=False)
     applications = relationship("Application", back_populates="user")
 
 
@@ -73,8 +150,8 @@ class UserProfile(Base):
     """User profile - reusable info for grant applications."""
     __tablename__ = "user_profiles"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False, unique=True)
 
     # Personal/Org Info
     full_name = Column(String(255))
@@ -108,7 +185,7 @@ class UserProfile(Base):
     years_in_operation = Column(Integer)
 
     # Timestamps
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     user = relationship("User", back_populates="profile")
@@ -117,11 +194,19 @@ class UserProfile(Base):
 class GrantProgram(Base):
     """Grant programs available in the system."""
     __tablename__ = "grant_programs"
+    __table_args__ = (
+        # list_programs: WHERE is_active [AND category] ORDER BY name
+        Index("ix_grant_programs_is_active_category_name", "is_active", "category", "name"),
+        # Full-text search (Postgres only; SQLite falls back to ILIKE)
+        Index(
+            "ix_grant_programs_search", text(PROGRAM_SEARCH_DOCUMENT), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(String(50), primary_key=True)  # e.g., "usda_dlt", "sba_7a"
     name = Column(String(255), nullable=False)
     agency = Column(String(100))  # USDA, SBA, HHS, etc.
-    category = Column(SQLEnum(GrantCategory))
+    category = Column(string_enum(GrantCategory))
 
     # Funding
     min_award = Column(Float)
@@ -131,7 +216,7 @@ class GrantProgram(Base):
     # Eligibility summary
     description = Column(Text)
     eligibility_summary = Column(Text)
-    required_fields = Column(Text)  # JSON list of required fields
+    required_fields = Column(JSON().with_variant(JSONB, "postgresql"))  # List of required field names
 
     # Deadlines
     deadline = Column(DateTime, nullable=True)
@@ -144,6 +229,9 @@ class GrantProgram(Base):
     # Status
     is_active = Column(Boolean, default=True)
 
+    # Timestamps (drive the program list/detail ETags)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
+
     # Relationships
     applications = relationship("Application", back_populates="program")
 
@@ -151,25 +239,36 @@ class GrantProgram(Base):
 class Application(Base):
     """A user's application for a specific grant."""
     __tablename__ = "applications"
-
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    __table_args__ = (
+        Index("ix_applications_user_id_status", "user_id", "status"),
+        Index("ix_applications_program_id_status", "program_id", "status"),
+        # At most one draft per user and program
+        Index(
+            "ix_applications_user_id_program_id_draft", "user_id", "program_id",
+            unique=True,
+            postgresql_where=text("status = 'draft'"),
+            sqlite_where=text("status = 'draft'"),
+        ),
+    )
+
+    id = Column(GUID(), primary_key=True, default=new_id)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
     program_id = Column(String(50), ForeignKey("grant_programs.id"), nullable=False)
 
     # Status
-    status = Column(SQLEnum(ApplicationStatus), default=ApplicationStatus.DRAFT)
+    status = Column(string_enum(ApplicationStatus), default=ApplicationStatus.DRAFT)
     completeness_score = Column(Float, default=0.0)  # 0-100
 
     # Application data (JSON)
-    form_data = Column(Text)  # JSON blob of all form fields
+    form_data = Column(JSON().with_variant(JSONB, "postgresql"))  # All form fields
     generated_narrative = Column(Text)
 
     # Documents
     pdf_path = Column(String(500))
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     submitted_at = Column(DateTime, nullable=True)
 
     # Relationships
@@ -180,13 +279,16 @@ class Application(Base):
 class DeviceToken(Base):
     """Device tokens for push notifications."""
     __tablename__ = "device_tokens"
+    __table_args__ = (
+        UniqueConstraint("user_id", "device_token", name="uq_device_tokens_user_id_device_token"),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
     device_token = Column(String(255), nullable=False, index=True)
     platform = Column(String(20), nullable=False)  # "ios" or "android"
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
     user = relationship("User", backref="device_tokens")
@@ -195,30 +297,66 @@ class DeviceToken(Base):
 class NotificationPreference(Base):
     """User notification preferences."""
     __tablename__ = "notification_preferences"
+    __table_args__ = (
+        # Deadline reminders: WHERE reminder_days_before @> ARRAY[n] (Postgres only)
+        Index(
+            "ix_notification_preferences_reminder_days_before", "reminder_days_before",
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, unique=True)
+    id = Column(GUID(), primary_key=True, default=new_id)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False, unique=True)
 
     # Notification types
     deadline_reminders = Column(Boolean, default=True)
     application_updates = Column(Boolean, default=True)
     new_grant_alerts = Column(Boolean, default=False)
 
-    # Reminder timing (JSON array of days before deadline)
-    reminder_days_before = Column(Text, default="[7, 3, 1]")
+    # Reminder timing (days before deadline)
+    reminder_days_before = Column(JSON().with_variant(ARRAY(Integer), "postgresql"), default=lambda: [7, 3, 1])
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     # Relationships
-    user = relationship("User", backref="notification_preferences")
+    user = relationship("User", back_populates="notification_preferences")
 
 
 # ============ Database Setup ============
 
-engine = create_engine(settings.database_url, echo=settings.debug)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def _engine_options(settings: Settings) -> dict:
+    """Pool settings for server databases; SQLite just needs cross-thread use."""
+    if settings.database_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+def _create_engine():
+    settings = get_settings()
+    return create_engine(
+        settings.database_url,
+        echo=settings.sql_echo,
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+        **_engine_options(settings),
+    )
+
+
+engine = _create_engine()
+# Objects stay loaded after commit so endpoints can return what they just wrote
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def init_db():
@@ -226,6 +364,28 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
+def warm_pool() -> int:
+    """Open pool_size connections up front so the first requests don't pay for connecting."""
+    if engine.dialect.name == "sqlite":
+        return 0
+    connections = []
+    try:
+        for _ in range(get_settings().db_pool_size):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+
+def dialect_insert(db: Session, model):
+    """INSERT for the session's database, with on_conflict_do_* support (Postgres or SQLite)."""
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return insert(model)
+
+
 def get_db():
     """Dependency for getting DB session."""
     db = SessionLocal()
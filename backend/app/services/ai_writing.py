@@ -5,187 +5,25 @@ Generates narrative content for grant applications using Google Gemini.
 Provides writing assistance for various application sections.
 """
 
+import asyncio
+import hashlib
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from functools import cached_property, lru_cache
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
-
-# Try to import Gemini client
-try:
-    from google import genai
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    HAS_GEMINI = bool(GOOGLE_API_KEY)
-except ImportError:
-    HAS_GEMINI = False
-    GOOGLE_API_KEY = None
-
-
-class AIWritingService:
-    """
-    AI-powered writing assistance for grant applications.
-    Uses Gemini 2.0 Flash for generation with fallback templates.
-    """
-
-    MODEL_NAME = "gemini-2.0-flash"
+import orjson
+from cachetools import TTLCache
 
-    def __init__(self):
-        self.client = None
-        if HAS_GEMINI and GOOGLE_API_KEY:
-            try:
-                self.client = genai.Client(api_key=GOOGLE_API_KEY)
-            except Exception as e:
-                logger.warning(f"Failed to initialize Gemini client: {e}")
+from app.config.settings import get_settings
 
-    async def generate_narrative(
-        self,
-        section_type: str,
-        context: Dict[str, Any],
-        max_words: int = 500,
-        tone: str = "professional"
-    ) -> str:
-        """
-        Generate a narrative section for a grant application.
-
-        Args:
-            section_type: Type of section (executive_summary, statement_of_need,
-                         project_description, budget_justification, sustainability)
-            context: Dict with relevant context (org_name, project_goals, etc.)
-            max_words: Maximum word count for the section
-            tone: Writing tone (professional, formal, conversational)
-
-        Returns:
-            Generated narrative text
-        """
-        if not self.client:
-            return self._get_fallback_narrative(section_type, context)
-
-        prompt = self._build_prompt(section_type, context, max_words, tone)
-
-        try:
-            response = self.client.models.generate_content(
-                model=self.MODEL_NAME,
-                contents=prompt
-            )
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Gemini generation failed: {e}")
-            return self._get_fallback_narrative(section_type, context)
-
-    async def improve_text(
-        self,
-        text: str,
-        improvement_type: str = "clarity",
-        context: Optional[Dict[str, Any]] = None
-    ) -> str:
-        """
-        Improve existing text.
-
-        Args:
-            text: Text to improve
-            improvement_type: Type of improvement (clarity, conciseness,
-                            persuasion, grammar, professionalism)
-            context: Optional additional context
-
-        Returns:
-            Improved text
-        """
-        if not self.client:
-            return text  # Return original if no AI available
-
-        prompts = {
-            "clarity": "Rewrite this text to be clearer and easier to understand, while maintaining the same meaning:",
-            "conciseness": "Make this text more concise without losing important information:",
-            "persuasion": "Make this text more persuasive and compelling for a grant application:",
-            "grammar": "Fix any grammar, spelling, or punctuation errors in this text:",
-            "professionalism": "Rewrite this text to sound more professional and formal:",
-        }
-
-        prompt = f"{prompts.get(improvement_type, prompts['clarity'])}\n\n{text}"
-
-        try:
-            response = self.client.models.generate_content(
-                model=self.MODEL_NAME,
-                contents=prompt
-            )
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Text improvement failed: {e}")
-            return text
-
-    async def generate_application_sections(
-        self,
-        profile_data: Dict[str, Any],
-        program_data: Dict[str, Any],
-        project_summary: Optional[str] = None
-    ) -> Dict[str, str]:
-        """
-        Generate all narrative sections for a grant application.
-
-        Args:
-            profile_data: User's profile information
-            program_data: Grant program details
-            project_summary: Optional user-provided project summary
-
-        Returns:
-            Dict with section names as keys and narratives as values
-        """
-        context = {
-            **profile_data,
-            "program_name": program_data.get("name", ""),
-            "program_agency": program_data.get("agency", ""),
-            "funding_range": f"${program_data.get('min_award', 0):,} - ${program_data.get('max_award', 0):,}",
-            "project_summary": project_summary or "",
-        }
-
-        sections = {}
-
-        # Generate each section
-        section_types = [
-            ("executive_summary", 200),
-            ("statement_of_need", 400),
-            ("project_description", 500),
-            ("goals_and_objectives", 300),
-            ("budget_justification", 300),
-            ("sustainability_plan", 250),
-        ]
-
-        for section_type, max_words in section_types:
-            sections[section_type] = await self.generate_narrative(
-                section_type=section_type,
-                context=context,
-                max_words=max_words
-            )
-
-        return sections
-
-    def _build_prompt(
-        self,
-        section_type: str,
-        context: Dict[str, Any],
-        max_words: int,
-        tone: str
-    ) -> str:
-        """Build a prompt for narrative generation."""
-
-        org_name = context.get("organization_name") or context.get("full_name", "the organization")
-        program_name = context.get("program_name", "this grant program")
-        project_summary = context.get("project_summary", "")
-
-        base_context = f"""
-Organization: {org_name}
-Organization Type: {context.get('organization_type', 'nonprofit')}
-Location: {context.get('city', '')}, {context.get('state', '')}
-Grant Program: {program_name}
-Agency: {context.get('program_agency', '')}
-"""
+logger = logging.getLogger(__name__)
 
-        if project_summary:
-            base_context += f"\nProject Summary: {project_summary}"
 
-        section_prompts = {
-            "executive_summary": f"""
+# Narrative prompts by section type, filled in with str.format_map
+_SECTION_TEMPLATES: Dict[str, str] = {
+    "executive_summary": """
 Write a compelling executive summary for a grant application.
 {base_context}
 
@@ -197,7 +35,7 @@ The executive summary should:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-            "statement_of_need": f"""
+    "statement_of_need": """
 Write a statement of need for a grant application.
 {base_context}
 
@@ -210,7 +48,7 @@ The statement of need should:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-            "project_description": f"""
+    "project_description": """
 Write a project description for a grant application.
 {base_context}
 
@@ -223,7 +61,7 @@ The project description should:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-            "goals_and_objectives": f"""
+    "goals_and_objectives": """
 Write goals and objectives for a grant application.
 {base_context}
 
@@ -234,10 +72,10 @@ Include:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-            "budget_justification": f"""
+    "budget_justification": """
 Write a budget justification narrative for a grant application.
 {base_context}
-Funding Range: {context.get('funding_range', 'varies')}
+Funding Range: {funding_range}
 
 The budget justification should:
 - Explain why each major budget category is necessary
@@ -247,7 +85,7 @@ The budget justification should:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-            "sustainability_plan": f"""
+    "sustainability_plan": """
 Write a sustainability plan for a grant application.
 {base_context}
 
@@ -259,18 +97,11 @@ The sustainability plan should:
 
 Write approximately {max_words} words in a {tone} tone.
 """,
-        }
-
-        return section_prompts.get(section_type, f"Write a {section_type} section for a grant application.\n{base_context}")
-
-    def _get_fallback_narrative(self, section_type: str, context: Dict[str, Any]) -> str:
-        """Return fallback template text when AI is unavailable."""
+}
 
-        org_name = context.get("organization_name") or context.get("full_name", "[Organization Name]")
-        program_name = context.get("program_name", "[Grant Program]")
-
-        fallbacks = {
-            "executive_summary": f"""
+# Placeholder text used when Gemini is unavailable, filled in with str.format_map
+_FALLBACK_TEMPLATES: Dict[str, str] = {
+    "executive_summary": """
 {org_name} respectfully requests funding from {program_name} to support our ongoing mission
 and expand our services to the community. This funding will enable us to [describe primary
 use of funds], directly benefiting [target population] in [service area].
@@ -279,7 +110,7 @@ Our organization has a proven track record of [key achievements], and we are wel
 to deliver measurable outcomes with this investment. We anticipate that this project will
 [describe expected impact].
 """,
-            "statement_of_need": f"""
+    "statement_of_need": """
 [Describe the problem or gap your project addresses]
 
 Our community faces significant challenges including [specific issues]. According to
@@ -289,7 +120,7 @@ in our service area.
 {org_name} is uniquely positioned to address this need because [explain organizational
 qualifications and community connections].
 """,
-            "project_description": f"""
+    "project_description": """
 {org_name} proposes to [brief project description] through the {program_name} opportunity.
 
 Project Activities:
@@ -304,7 +135,7 @@ Timeline:
 
 This project will serve [target population] and result in [expected outcomes].
 """,
-            "goals_and_objectives": f"""
+    "goals_and_objectives": """
 Goal 1: [Broad outcome statement]
 - Objective 1.1: [Specific, measurable objective]
 - Objective 1.2: [Specific, measurable objective]
@@ -315,7 +146,7 @@ Goal 2: [Broad outcome statement]
 
 Success will be measured through [describe evaluation methods and metrics].
 """,
-            "budget_justification": f"""
+    "budget_justification": """
 Personnel: Funds will support [positions] essential for project implementation and oversight.
 
 Equipment/Supplies: [Describe necessary purchases] are required to [explain purpose].
@@ -325,7 +156,7 @@ Other Costs: [Describe additional budget items] support [explain how they enable
 All costs are based on [market rates/organizational standards] and are necessary for
 achieving project objectives.
 """,
-            "sustainability_plan": f"""
+    "sustainability_plan": """
 {org_name} is committed to sustaining this project beyond the grant period through:
 
 1. Diversified Funding: We will pursue [other funding sources] to continue operations.
@@ -337,10 +168,331 @@ achieving project objectives.
 4. Organizational Capacity: Our established infrastructure and experienced team ensure
    long-term viability.
 """,
+}
+
+# Rewrite instructions for improve_text
+_IMPROVEMENT_PROMPTS: Dict[str, str] = {
+    "clarity": "Rewrite this text to be clearer and easier to understand, while maintaining the same meaning:",
+    "conciseness": "Make this text more concise without losing important information:",
+    "persuasion": "Make this text more persuasive and compelling for a grant application:",
+    "grammar": "Fix any grammar, spelling, or punctuation errors in this text:",
+    "professionalism": "Rewrite this text to sound more professional and formal:",
+}
+
+# Generated narratives by request fingerprint, so regenerations and retries
+# with the same inputs skip Gemini. Only successful generations are stored.
+_narrative_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+# Generations currently running, so identical concurrent requests share one call
+_narrative_inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+
+def narrative_cache_key(section_type: str, context: Dict[str, Any], max_words: int, tone: str) -> str:
+    """Stable fingerprint of a narrative request (context key order doesn't matter)."""
+    payload = orjson.dumps(
+        {"s": section_type, "c": context, "w": max_words, "t": tone},
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+class AIWritingService:
+    """
+    AI-powered writing assistance for grant applications.
+    Uses Gemini 2.0 Flash for generation with fallback templates.
+    """
+
+    MODEL_NAME = "gemini-2.0-flash"
+
+    # Application sections in document order, with target word counts
+    SECTION_TYPES = [
+        ("executive_summary", 200),
+        ("statement_of_need", 400),
+        ("project_description", 500),
+        ("goals_and_objectives", 300),
+        ("budget_justification", 300),
+        ("sustainability_plan", 250),
+    ]
+
+    @cached_property
+    def client(self):
+        """Gemini client, built on first use; None without an API key or google-genai."""
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            return None
+        try:
+            from google import genai
+            return genai.Client(api_key=api_key)
+        except Exception as e:
+            logger.warning(f"Failed to initialize Gemini client: {e}")
+            return None
+
+    async def generate_narrative(
+        self,
+        section_type: str,
+        context: Dict[str, Any],
+        max_words: int = 500,
+        tone: str = "professional"
+    ) -> str:
+        """
+        Generate a narrative section for a grant application.
+
+        Args:
+            section_type: Type of section (executive_summary, statement_of_need,
+                         project_description, budget_justification, sustainability)
+            context: Dict with relevant context (org_name, project_goals, etc.)
+            max_words: Maximum word count for the section
+            tone: Writing tone (professional, formal, conversational)
+
+        Returns:
+            Generated narrative text
+        """
+        if not self.client:
+            return self._get_fallback_narrative(section_type, context)
+
+        key = narrative_cache_key(section_type, context, max_words, tone)
+        cached = _narrative_cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = _narrative_inflight.get(key)
+        if pending is None:
+            prompt = self._build_prompt(section_type, context, max_words, tone)
+            pending = _narrative_inflight[key] = asyncio.ensure_future(self._generate_text(prompt))
+            pending.add_done_callback(lambda _: _narrative_inflight.pop(key, None))
+
+        try:
+            # Shield so one cancelled caller doesn't cancel the shared generation
+            text = await asyncio.shield(pending)
+        except Exception as e:
+            logger.error(f"Gemini generation failed: {e}")
+            return self._get_fallback_narrative(section_type, context)
+
+        _narrative_cache[key] = text
+        return text
+
+    async def generate_narrative_stream(
+        self,
+        section_type: str,
+        context: Dict[str, Any],
+        max_words: int = 500,
+        tone: str = "professional"
+    ) -> AsyncIterator[str]:
+        """
+        Generate a narrative section, yielding text as Gemini produces it.
+
+        Cached and fallback narratives arrive as a single chunk. The finished
+        text is cached the same way as generate_narrative. A failure before any
+        text falls back; a failure mid-stream is re-raised so callers don't
+        mistake the partial text for a finished narrative.
+
+        Yields:
+            Successive pieces of the narrative text
+        """
+        if not self.client:
+            yield self._get_fallback_narrative(section_type, context)
+            return
+
+        key = narrative_cache_key(section_type, context, max_words, tone)
+        cached = _narrative_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = self._build_prompt(section_type, context, max_words, tone)
+        chunks: List[str] = []
+        try:
+            async for chunk in await self.client.aio.models.generate_content_stream(
+                model=self.MODEL_NAME,
+                contents=prompt
+            ):
+                text = chunk.text if chunks else (chunk.text or "").lstrip()
+                if text:
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            logger.error(f"Gemini streaming failed: {e}")
+            if chunks:
+                # Part of the text is already out; don't let it pass for a finished narrative
+                raise
+            yield self._get_fallback_narrative(section_type, context)
+            return
+
+        _narrative_cache[key] = "".join(chunks).strip()
+
+    async def _generate_text(self, prompt: str) -> str:
+        """Send a prompt to Gemini and return the stripped response text."""
+        response = await self.client.aio.models.generate_content(
+            model=self.MODEL_NAME,
+            contents=prompt
+        )
+        return response.text.strip()
+
+    async def improve_text(
+        self,
+        text: str,
+        improvement_type: str = "clarity",
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Improve existing text.
+
+        Args:
+            text: Text to improve
+            improvement_type: Type of improvement (clarity, conciseness,
+                            persuasion, grammar, professionalism)
+            context: Optional additional context
+
+        Returns:
+            Improved text
+        """
+        if not self.client:
+            return text  # Return original if no AI available
+
+        instruction = _IMPROVEMENT_PROMPTS.get(improvement_type, _IMPROVEMENT_PROMPTS["clarity"])
+        prompt = f"{instruction}\n\n{text}"
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.MODEL_NAME,
+                contents=prompt
+            )
+            return response.text.strip()
+        except Exception as e:
+            logger.error(f"Text improvement failed: {e}")
+            return text
+
+    async def generate_application_sections(
+        self,
+        profile_data: Dict[str, Any],
+        program_data: Dict[str, Any],
+        project_summary: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Generate all narrative sections for a grant application.
+
+        Args:
+            profile_data: User's profile information
+            program_data: Grant program details
+            project_summary: Optional user-provided project summary
+
+        Returns:
+            Dict with section names as keys and narratives as values
+        """
+        return {
+            section_type: text
+            async for section_type, text in self.generate_application_sections_stream(
+                profile_data, program_data, project_summary
+            )
+        }
+
+    async def generate_application_sections_stream(
+        self,
+        profile_data: Dict[str, Any],
+        program_data: Dict[str, Any],
+        project_summary: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Generate narrative sections concurrently, yielding them in document order.
+
+        Args:
+            profile_data: User's profile information
+            program_data: Grant program details
+            project_summary: Optional user-provided project summary
+
+        Yields:
+            (section name, narrative) as each section is produced
+        """
+        context = self.build_context(profile_data, program_data, project_summary)
+
+        semaphore = asyncio.Semaphore(get_settings().gemini_concurrency)
+
+        async def generate(section_type: str, max_words: int) -> str:
+            async with semaphore:
+                return await self.generate_narrative(
+                    section_type=section_type,
+                    context=context,
+                    max_words=max_words
+                )
+
+        tasks = [
+            (section_type, asyncio.ensure_future(generate(section_type, max_words)))
+            for section_type, max_words in self.SECTION_TYPES
+        ]
+        try:
+            for section_type, task in tasks:
+                try:
+                    text = await task
+                except Exception as e:
+                    logger.error(f"Generating {section_type} failed: {e}")
+                    text = self._get_fallback_narrative(section_type, context)
+                yield section_type, text
+        finally:
+            for _, task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def build_context(
+        profile_data: Dict[str, Any],
+        program_data: Dict[str, Any],
+        project_summary: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Combine profile and program details into the context used for every section."""
+        return {
+            **profile_data,
+            "program_name": program_data.get("name", ""),
+            "program_agency": program_data.get("agency", ""),
+            "funding_range": f"${program_data.get('min_award') or 0:,} - ${program_data.get('max_award') or 0:,}",
+            "project_summary": project_summary or "",
         }
 
-        return fallbacks.get(section_type, f"[Please write your {section_type} here]").strip()
+    def _build_prompt(
+        self,
+        section_type: str,
+        context: Dict[str, Any],
+        max_words: int,
+        tone: str
+    ) -> str:
+        """Build a prompt for narrative generation."""
+
+        org_name = context.get("organization_name") or context.get("full_name", "the organization")
+        program_name = context.get("program_name", "this grant program")
+        project_summary = context.get("project_summary", "")
+
+        base_context = f"""
+Organization: {org_name}
+Organization Type: {context.get('organization_type', 'nonprofit')}
+Location: {context.get('city', '')}, {context.get('state', '')}
+Grant Program: {program_name}
+Agency: {context.get('program_agency', '')}
+"""
+
+        if project_summary:
+            base_context += f"\nProject Summary: {project_summary}"
+
+        template = _SECTION_TEMPLATES.get(section_type)
+        if template is None:
+            return f"Write a {section_type} section for a grant application.\n{base_context}"
+        return template.format_map({
+            "base_context": base_context,
+            "funding_range": context.get("funding_range", "varies"),
+            "max_words": max_words,
+            "tone": tone,
+        })
+
+    def _get_fallback_narrative(self, section_type: str, context: Dict[str, Any]) -> str:
+        """Return fallback template text when AI is unavailable."""
+
+        org_name = context.get("organization_name") or context.get("full_name", "[Organization Name]")
+        program_name = context.get("program_name", "[Grant Program]")
+
+        template = _FALLBACK_TEMPLATES.get(section_type)
+        if template is None:
+            return f"[Please write your {section_type} here]"
+        return template.format_map({"org_name": org_name, "program_name": program_name}).strip()
 
 
-# Singleton instance
-ai_writing_service = AIWritingService()
+@lru_cache(maxsize=1)
+def get_ai_writing_service() -> AIWritingService:
+    """Shared service instance, created on first use."""
+    return AIWritingService()
@@ -8,11 +8,19 @@ Generates:
 """
 
 import io
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+from typing import Optional, Dict, Any, Callable, List, BinaryIO, Iterator
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
@@ -20,11 +28,210 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
+from app.config.settings import get_settings
 from app.models.database import GrantProgram, Application, UserProfile
 
+# Per-attribute validation on graphics shapes is only useful while developing
+if not get_settings().debug:
+    rl_config.shapeChecking = 0
 
+PDF_CHUNK_SIZE = 64 * 1024
+PDF_SPOOL_MAX_SIZE = 1024 * 1024  # Larger documents spill to a temp file
+
+# Every GrantProgram attribute the summary PDF reads
+PROGRAM_PDF_FIELDS = (
+    "id", "name", "agency", "category", "min_award", "max_award", "match_required",
+    "deadline", "rolling_deadline", "description", "eligibility_summary",
+    "program_url", "application_url",
+)
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _stylesheet(*specs: Dict[str, Any]) -> StyleSheet1:
+    """Sample stylesheet plus custom ParagraphStyles; each spec's parent is a style name."""
+    styles = getSampleStyleSheet()
+    for spec in specs:
+        spec = dict(spec)
+        styles.add(ParagraphStyle(parent=styles[spec.pop('parent')], **spec))
+    return styles
+
+
+# Stylesheets for each document type, built once at import instead of per render
+_SUMMARY_STYLES = _stylesheet(
+    dict(
+        name='GrantTitle',
+        parent='Heading1',
+        fontSize=18,
+        textColor=colors.HexColor('#0d9488'),
+        spaceAfter=6,
+        alignment=TA_CENTER,
+    ),
+    dict(
+        name='GrantSubtitle',
+        parent='Normal',
+        fontSize=11,
+        textColor=colors.HexColor('#6b7280'),
+        alignment=TA_CENTER,
+        spaceAfter=12,
+    ),
+    dict(
+        name='SectionHeader',
+        parent='Heading2',
+        fontSize=12,
+        textColor=colors.HexColor('#0d9488'),
+        spaceBefore=12,
+        spaceAfter=6,
+        borderPadding=4,
+        backColor=colors.HexColor('#f0fdfa'),
+    ),
+    dict(
+        name='GrantBody',
+        parent='Normal',
+        fontSize=10,
+        leading=14,
+    ),
+    dict(
+        name='SmallText',
+        parent='Normal',
+        fontSize=9,
+        textColor=colors.HexColor('#6b7280'),
+    ),
+)
+
+_APP_STYLES = _stylesheet(
+    dict(
+        name='AppTitle',
+        parent='Heading1',
+        fontSize=16,
+        textColor=colors.HexColor('#0d9488'),
+        spaceAfter=4,
+        alignment=TA_CENTER,
+    ),
+    dict(
+        name='AppSubtitle',
+        parent='Normal',
+        fontSize=10,
+        textColor=colors.HexColor('#6b7280'),
+        alignment=TA_CENTER,
+        spaceAfter=12,
+    ),
+    dict(
+        name='AppSection',
+        parent='Heading2',
+        fontSize=12,
+        textColor=colors.HexColor('#0d9488'),
+        spaceBefore=14,
+        spaceAfter=6,
+    ),
+    dict(
+        name='AppBody',
+        parent='Normal',
+        fontSize=10,
+        leading=14,
+    ),
+    dict(
+        name='AppLabel',
+        parent='Normal',
+        fontSize=9,
+        textColor=colors.HexColor('#6b7280'),
+    ),
+    dict(name='AppFooter', parent='AppLabel', alignment=TA_CENTER),
+)
+
+_REPORT_STYLES = _stylesheet(
+    dict(
+        name='ReportTitle',
+        parent='Heading1',
+        fontSize=18,
+        textColor=colors.HexColor('#0d9488'),
+        spaceAfter=6,
+        alignment=TA_CENTER,
+    ),
+    dict(
+        name='ReportSubtitle',
+        parent='Normal',
+        fontSize=11,
+        textColor=colors.HexColor('#6b7280'),
+        alignment=TA_CENTER,
+        spaceAfter=12,
+    ),
+    dict(
+        name='ReportSection',
+        parent='Heading2',
+        fontSize=12,
+        textColor=colors.HexColor('#0d9488'),
+        spaceBefore=12,
+        spaceAfter=6,
+        backColor=colors.HexColor('#f0fdfa'),
+    ),
+    dict(
+        name='ReportBody',
+        parent='Normal',
+        fontSize=10,
+        leading=14,
+    ),
+    dict(
+        name='ProgramName',
+        parent='Normal',
+        fontSize=11,
+        textColor=colors.HexColor('#059669'),
+        fontName='Helvetica-Bold',
+    ),
+    dict(
+        name='ReportSmall',
+        parent='Normal',
+        fontSize=9,
+        textColor=colors.HexColor('#6b7280'),
+    ),
+    dict(name='ProgDetails', parent='Normal', fontSize=9, leading=13, leftIndent=20, spaceAfter=2),
+    dict(name='ProgDesc', parent='ReportSmall', leftIndent=20),
+)
+
+
+# Table styles are read-only once built, so every document shares the same instances
+_FACTS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Applicant block of the application draft and profile block of the eligibility report
+_PROFILE_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Eligibility report text blocks, laid out as one multi-line Paragraph each
+_DETAIL_LABEL = '<font color="#6b7280">{}</font>'
+_NEXT_STEPS = "<br/>".join([
+    "1. Review each program's eligibility requirements in detail",
+    "2. Ensure your SAM.gov registration is current (required for federal grants)",
+    "3. Gather required documents: EIN, UEI, financial statements",
+    "4. Start your application in the GrantsAssist app",
+])
+
+
+@lru_cache(maxsize=4096)
+def _esc(text: str) -> str:
+    """
+    Escape data for Paragraph markup, which would otherwise choke on '&' or '<'.
+
+    Program names, agencies and descriptions recur across every PDF, so they
+    are escaped once per process; one-off narratives use escape() directly.
+    """
+    return escape(text)
+
+
+@lru_cache(maxsize=1024)
 def format_currency(amount: float) -> str:
-    """Format amount as currency."""
+    """Format amount as currency (award amounts repeat across programs, so results are memoized)."""
     if amount >= 1_000_000:
         return f"${amount/1_000_000:.1f}M"
     elif amount >= 1_000:
@@ -43,8 +250,14 @@ def generate_grant_summary_pdf(program: GrantProgram) -> bytes:
         PDF bytes
     """
     buffer = io.BytesIO()
+    _build_grant_summary_pdf(buffer, program)
+    return buffer.getvalue()
+
+
+def _build_grant_summary_pdf(out: BinaryIO, program: GrantProgram) -> None:
+    """Render the grant summary PDF into a writable binary stream."""
     doc = SimpleDocTemplate(
-        buffer,
+        out,
         pagesize=letter,
         rightMargin=0.75*inch,
         leftMargin=0.75*inch,
@@ -52,51 +265,13 @@ def generate_grant_summary_pdf(program: GrantProgram) -> bytes:
         bottomMargin=0.5*inch
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='GrantTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#0d9488'),
-        spaceAfter=6,
-        alignment=TA_CENTER
-    ))
-    styles.add(ParagraphStyle(
-        name='GrantSubtitle',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#6b7280'),
-        alignment=TA_CENTER,
-        spaceAfter=12
-    ))
-    styles.add(ParagraphStyle(
-        name='SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#0d9488'),
-        spaceBefore=12,
-        spaceAfter=6,
-        borderPadding=4,
-        backColor=colors.HexColor('#f0fdfa')
-    ))
-    styles.add(ParagraphStyle(
-        name='BodyText',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14
-    ))
-    styles.add(ParagraphStyle(
-        name='SmallText',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#6b7280')
-    ))
+    styles = _SUMMARY_STYLES
 
     story = []
 
     # Header
-    story.append(Paragraph(program.name, styles['GrantTitle']))
-    story.append(Paragraph(f"Agency: {program.agency or 'N/A'}", styles['GrantSubtitle']))
+    story.append(Paragraph(_esc(program.name), styles['GrantTitle']))
+    story.append(Paragraph(f"Agency: {_esc(program.agency or 'N/A')}", styles['GrantSubtitle']))
     story.append(Paragraph(
         f"Generated: {datetime.now().strftime('%B %d, %Y')}",
         styles['SmallText']
@@ -126,36 +301,29 @@ def generate_grant_summary_pdf(program: GrantProgram) -> bytes:
     ]
 
     facts_table = Table(facts_data, colWidths=[1.5*inch, 5*inch])
-    facts_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    facts_table.setStyle(_FACTS_TABLE_STYLE)
     story.append(facts_table)
     story.append(Spacer(1, 12))
 
     # Description
     if program.description:
         story.append(Paragraph("Program Overview", styles['SectionHeader']))
-        story.append(Paragraph(program.description, styles['BodyText']))
+        story.append(Paragraph(_esc(program.description), styles['GrantBody']))
         story.append(Spacer(1, 8))
 
     # Eligibility
     if program.eligibility_summary:
         story.append(Paragraph("Eligibility Requirements", styles['SectionHeader']))
-        story.append(Paragraph(program.eligibility_summary, styles['BodyText']))
+        story.append(Paragraph(_esc(program.eligibility_summary), styles['GrantBody']))
         story.append(Spacer(1, 8))
 
     # Links
     if program.program_url or program.application_url:
         story.append(Paragraph("Resources", styles['SectionHeader']))
         if program.program_url:
-            story.append(Paragraph(f"Program Info: {program.program_url}", styles['SmallText']))
+            story.append(Paragraph(f"Program Info: {_esc(program.program_url)}", styles['SmallText']))
         if program.application_url:
-            story.append(Paragraph(f"Apply: {program.application_url}", styles['SmallText']))
+            story.append(Paragraph(f"Apply: {_esc(program.application_url)}", styles['SmallText']))
 
     # Footer
     story.append(Spacer(1, 20))
@@ -167,8 +335,44 @@ def generate_grant_summary_pdf(program: GrantProgram) -> bytes:
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+
+
+def program_snapshot(program: GrantProgram) -> SimpleNamespace:
+    """Plain, picklable copy of the program fields the summary PDF reads."""
+    return SimpleNamespace(**{field: getattr(program, field) for field in PROGRAM_PDF_FIELDS})
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Worker processes for rendering, started on first use."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=get_settings().pdf_workers or None,
+                # Forking a threaded server can copy held locks into the child
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the rendering processes (call at app shutdown)."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(cancel_futures=True)
+            _pdf_pool = None
+
+
+def render_grant_summary_pdf(program: GrantProgram) -> bytes:
+    """
+    Generate a grant summary PDF in a worker process.
+
+    ReportLab layout is pure Python and holds the GIL, so rendering in request
+    threads serializes every download; worker processes render them in parallel.
+    The calling thread blocks on the result, which releases the GIL.
+    """
+    return get_pdf_pool().submit(generate_grant_summary_pdf, program_snapshot(program)).result()
 
 
 def generate_application_pdf(
@@ -190,8 +394,49 @@ def generate_application_pdf(
         PDF bytes
     """
     buffer = io.BytesIO()
+    _build_application_pdf(buffer, application, profile, program, narratives)
+    return buffer.getvalue()
+
+
+def iter_application_pdf(
+    application: Application,
+    profile: Optional[UserProfile] = None,
+    program: Optional[GrantProgram] = None,
+    narratives: Optional[Dict[str, str]] = None,
+    chunk_size: int = PDF_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Generate a draft application PDF as a stream of chunks.
+
+    The document is rendered into a spooled temp file (spilling to disk for
+    large PDFs) and read back in chunks, so the full PDF is never held in
+    memory as a single bytes object.
+
+    Yields:
+        PDF byte chunks of at most chunk_size bytes
+    """
+    return _iter_spooled(_build_application_pdf, chunk_size, application, profile, program, narratives)
+
+
+def _iter_spooled(build: Callable[..., None], chunk_size: int, *args: Any) -> Iterator[bytes]:
+    """Run build(out, *args) into a spooled temp file, then read it back in chunks."""
+    with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE) as spool:
+        build(spool, *args)
+        spool.seek(0)
+        while chunk := spool.read(chunk_size):
+            yield chunk
+
+
+def _build_application_pdf(
+    out: BinaryIO,
+    application: Application,
+    profile: Optional[UserProfile],
+    program: Optional[GrantProgram],
+    narratives: Optional[Dict[str, str]]
+) -> None:
+    """Render the draft application PDF into a writable binary stream."""
     doc = SimpleDocTemplate(
-        buffer,
+        out,
         pagesize=letter,
         rightMargin=0.75*inch,
         leftMargin=0.75*inch,
@@ -199,50 +444,14 @@ def generate_application_pdf(
         bottomMargin=0.5*inch
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='AppTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#0d9488'),
-        spaceAfter=4,
-        alignment=TA_CENTER
-    ))
-    styles.add(ParagraphStyle(
-        name='AppSubtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#6b7280'),
-        alignment=TA_CENTER,
-        spaceAfter=12
-    ))
-    styles.add(ParagraphStyle(
-        name='AppSection',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#0d9488'),
-        spaceBefore=14,
-        spaceAfter=6,
-    ))
-    styles.add(ParagraphStyle(
-        name='AppBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14
-    ))
-    styles.add(ParagraphStyle(
-        name='AppLabel',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#6b7280')
-    ))
+    styles = _APP_STYLES
 
     story = []
 
     # Cover Page
     program_name = program.name if program else "Grant Application"
     story.append(Paragraph(f"Draft Application", styles['AppTitle']))
-    story.append(Paragraph(program_name, styles['AppSubtitle']))
+    story.append(Paragraph(_esc(program_name), styles['AppSubtitle']))
     story.append(Spacer(1, 8))
 
     # Status badge
@@ -275,12 +484,7 @@ def generate_application_pdf(
 
         if applicant_data:
             app_table = Table(applicant_data, colWidths=[1.3*inch, 5*inch])
-            app_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ]))
+            app_table.setStyle(_PROFILE_TABLE_STYLE)
             story.append(app_table)
         story.append(Spacer(1, 8))
 
@@ -290,13 +494,13 @@ def generate_application_pdf(
             if content:
                 # Convert section key to title
                 title = section_name.replace('_', ' ').title()
-                story.append(Paragraph(title, styles['AppSection']))
-                story.append(Paragraph(content, styles['AppBody']))
+                story.append(Paragraph(_esc(title), styles['AppSection']))
+                story.append(Paragraph(escape(content), styles['AppBody']))
 
     # If we have generated narrative from the application
     if application.generated_narrative and not narratives:
         story.append(Paragraph("Project Narrative", styles['AppSection']))
-        story.append(Paragraph(application.generated_narrative, styles['AppBody']))
+        story.append(Paragraph(escape(application.generated_narrative), styles['AppBody']))
 
     # Completeness
     story.append(Spacer(1, 16))
@@ -314,12 +518,10 @@ def generate_application_pdf(
     story.append(Paragraph(
         "DRAFT - This document is for review purposes only. "
         "Final submission must be made through the official application portal.",
-        ParagraphStyle('Footer', parent=styles['AppLabel'], alignment=TA_CENTER)
+        styles['AppFooter']
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
 
 
 def generate_eligibility_report_pdf(
@@ -339,8 +541,37 @@ def generate_eligibility_report_pdf(
         PDF bytes
     """
     buffer = io.BytesIO()
+    _build_eligibility_report_pdf(buffer, profile, eligible_programs, match_scores)
+    return buffer.getvalue()
+
+
+def iter_eligibility_report_pdf(
+    profile: UserProfile,
+    eligible_programs: List[GrantProgram],
+    match_scores: Optional[Dict[str, float]] = None,
+    chunk_size: int = PDF_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Generate an eligibility report PDF as a stream of chunks.
+
+    Reports listing hundreds of programs are large; like iter_application_pdf,
+    this never holds the whole document in memory as one bytes object.
+
+    Yields:
+        PDF byte chunks of at most chunk_size bytes
+    """
+    return _iter_spooled(_build_eligibility_report_pdf, chunk_size, profile, eligible_programs, match_scores)
+
+
+def _build_eligibility_report_pdf(
+    out: BinaryIO,
+    profile: UserProfile,
+    eligible_programs: List[GrantProgram],
+    match_scores: Optional[Dict[str, float]]
+) -> None:
+    """Render the eligibility report PDF into a writable binary stream."""
     doc = SimpleDocTemplate(
-        buffer,
+        out,
         pagesize=letter,
         rightMargin=0.75*inch,
         leftMargin=0.75*inch,
@@ -348,58 +579,14 @@ def generate_eligibility_report_pdf(
         bottomMargin=0.5*inch
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='ReportTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#0d9488'),
-        spaceAfter=6,
-        alignment=TA_CENTER
-    ))
-    styles.add(ParagraphStyle(
-        name='ReportSubtitle',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#6b7280'),
-        alignment=TA_CENTER,
-        spaceAfter=12
-    ))
-    styles.add(ParagraphStyle(
-        name='ReportSection',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#0d9488'),
-        spaceBefore=12,
-        spaceAfter=6,
-        backColor=colors.HexColor('#f0fdfa')
-    ))
-    styles.add(ParagraphStyle(
-        name='ReportBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14
-    ))
-    styles.add(ParagraphStyle(
-        name='ProgramName',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#059669'),
-        fontName='Helvetica-Bold'
-    ))
-    styles.add(ParagraphStyle(
-        name='ReportSmall',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#6b7280')
-    ))
+    styles = _REPORT_STYLES
 
     story = []
 
     # Header
     org_name = profile.organization_name or profile.full_name or "Your Organization"
     story.append(Paragraph("Grant Eligibility Report", styles['ReportTitle']))
-    story.append(Paragraph(f"Prepared for: {org_name}", styles['ReportSubtitle']))
+    story.append(Paragraph(f"Prepared for: {_esc(org_name)}", styles['ReportSubtitle']))
     story.append(Paragraph(
         f"Generated: {datetime.now().strftime('%B %d, %Y')}",
         styles['ReportSmall']
@@ -434,12 +621,7 @@ def generate_eligibility_report_pdf(
 
     if profile_items:
         prof_table = Table(profile_items, colWidths=[1.5*inch, 5*inch])
-        prof_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        prof_table.setStyle(_PROFILE_TABLE_STYLE)
         story.append(prof_table)
     story.append(Spacer(1, 12))
 
@@ -462,7 +644,7 @@ def generate_eligibility_report_pdf(
                 score = match_scores[program.id]
                 score_text = f" ({score:.0f}% match)"
 
-            story.append(Paragraph(f"✓ {program.name}{score_text}", styles['ProgramName']))
+            story.append(Paragraph(f"✓ {_esc(program.name)}{score_text}", styles['ProgramName']))
 
             # Program details
             funding = "Varies"
@@ -473,38 +655,22 @@ def generate_eligibility_report_pdf(
                 program.deadline.strftime('%B %d, %Y') if program.deadline else "TBD"
             )
 
-            details = [
-                ["Agency:", program.agency or "N/A"],
-                ["Funding:", funding],
-                ["Deadline:", deadline],
-            ]
-
-            det_table = Table(details, colWidths=[1*inch, 4*inch])
-            det_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6b7280')),
-                ('LEFTPADDING', (0, 0), (-1, -1), 20),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            story.append(det_table)
+            # One Paragraph per program instead of a Table
+            story.append(Paragraph(
+                f"{_DETAIL_LABEL.format('Agency:')} {_esc(program.agency or 'N/A')}<br/>"
+                f"{_DETAIL_LABEL.format('Funding:')} {funding}<br/>"
+                f"{_DETAIL_LABEL.format('Deadline:')} {deadline}",
+                styles['ProgDetails']
+            ))
 
             if program.description:
                 desc = program.description[:200] + "..." if len(program.description) > 200 else program.description
-                story.append(Paragraph(desc, ParagraphStyle(
-                    'ProgDesc', parent=styles['ReportSmall'], leftIndent=20
-                )))
+                story.append(Paragraph(_esc(desc), styles['ProgDesc']))
 
     # Next Steps
     story.append(Spacer(1, 16))
     story.append(Paragraph("Next Steps", styles['ReportSection']))
-    steps = [
-        "1. Review each program's eligibility requirements in detail",
-        "2. Ensure your SAM.gov registration is current (required for federal grants)",
-        "3. Gather required documents: EIN, UEI, financial statements",
-        "4. Start your application in the GrantsAssist app",
-    ]
-    for step in steps:
-        story.append(Paragraph(step, styles['ReportBody']))
+    story.append(Paragraph(_NEXT_STEPS, styles['ReportBody']))
 
     # Footer
     story.append(Spacer(1, 20))
@@ -517,5 +683,3 @@ def generate_eligibility_report_pdf(
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
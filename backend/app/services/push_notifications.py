@@ -1,14 +1,54 @@
 """Push notification service for sending notifications via APNs."""
-import json
+import asyncio
+import threading
 import time
 import jwt
 import httpx
+import orjson
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cachetools import TTLCache
+from functools import lru_cache
 from typing import Optional, List
 from datetime import datetime, timedelta
+from sqlalchemy import Integer, Row, and_, exists, func, or_, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
-from app.config.settings import settings
-from app.models.database import DeviceToken, GrantProgram, User
+from app.config.settings import get_settings
+from app.models.database import DeviceToken, GrantProgram, NotificationPreference
+
+
+# Signed provider tokens, shared by every APNsService in the process. APNs accepts a
+# token for up to an hour and rejects refreshes more often than every 20 minutes.
+_apns_token_cache: TTLCache = TTLCache(maxsize=4, ttl=3000)  # (team_id, key_id) -> JWT
+_apns_token_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _load_private_key(key_content: str, key_path: str) -> ec.EllipticCurvePrivateKey:
+    """The parsed APNs signing key from env var or file, loaded once per process.
+
+    PyJWT re-parses a PEM string on every encode; passing it the key object skips that.
+    """
+    private_key = None
+    if key_content:
+        # Use key content directly (for Railway/cloud deployment)
+        private_key = key_content.replace("\\n", "\n")
+    elif key_path:
+        # Read from file (for local development)
+        try:
+            with open(key_path, 'r') as f:
+                private_key = f.read()
+        except FileNotFoundError:
+            raise ValueError(f"APNs key file not found: {key_path}")
+
+    if not private_key:
+        raise ValueError("APNs key not configured (set APNS_KEY_CONTENT or APNS_KEY_PATH)")
+    try:
+        return serialization.load_pem_private_key(private_key.encode(), password=None)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"APNs key is not a valid PEM private key: {e}")
 
 
 class APNsService:
@@ -18,15 +58,43 @@ class APNsService:
     SANDBOX_URL = "https://api.sandbox.push.apple.com"
     PRODUCTION_URL = "https://api.push.apple.com"
 
+    # Requests in flight at once; APNs allows ~1000 streams on one HTTP/2 connection
+    MAX_CONCURRENT_STREAMS = 100
+    # Sends scheduled as tasks at once during a fan-out, so big broadcasts don't hold a task per device
+    FANOUT_BATCH_SIZE = 1000
+
     def __init__(self):
+        settings = get_settings()
         self.team_id = settings.apns_team_id
         self.key_id = settings.apns_key_id
         self.bundle_id = settings.apns_bundle_id
         self.key_path = settings.apns_key_path
         self.key_content = settings.apns_key_content
         self.use_sandbox = settings.apns_use_sandbox
-        self._token: Optional[str] = None
-        self._token_expires: float = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._streams: Optional[asyncio.Semaphore] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """One HTTP/2 connection to APNs, created on first send and reused (requests multiplex)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    # Apple asks providers to keep the connection open rather than reconnect per batch
+                    limits=httpx.Limits(max_connections=1, max_keepalive_connections=1, keepalive_expiry=600.0),
+                    retries=1,  # retry a failed connect (never a sent request)
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+            self._streams = asyncio.Semaphore(self.MAX_CONCURRENT_STREAMS)
+        return self._client
+
+    async def close(self):
+        """Close the APNs connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     @property
     def base_url(self) -> str:
@@ -34,39 +102,49 @@ class APNsService:
 
     def _generate_token(self) -> str:
         """Generate JWT token for APNs authentication."""
-        if self._token and time.time() < self._token_expires:
-            return self._token
-
-        # Get private key from env var or file
-        private_key = None
-        if self.key_content:
-            # Use key content directly (for Railway/cloud deployment)
-            private_key = self.key_content.replace("\\n", "\n")
-        elif self.key_path:
-            # Read from file (for local development)
-            try:
-                with open(self.key_path, 'r') as f:
-                    private_key = f.read()
-            except FileNotFoundError:
-                raise ValueError(f"APNs key file not found: {self.key_path}")
+        cache_key = (self.team_id, self.key_id)
+        with _apns_token_lock:
+            token = _apns_token_cache.get(cache_key)
+            if token is None:
+                private_key = _load_private_key(self.key_content, self.key_path)
+
+                # Generate JWT
+                headers = {
+                    "alg": "ES256",
+                    "kid": self.key_id
+                }
+                payload = {
+                    "iss": self.team_id,
+                    "iat": int(time.time())
+                }
 
-        if not private_key:
-            raise ValueError("APNs key not configured (set APNS_KEY_CONTENT or APNS_KEY_PATH)")
+                token = jwt.encode(payload, private_key, algorithm="ES256", headers=headers)
+                _apns_token_cache[cache_key] = token
+        return token
 
-        # Generate JWT
-        headers = {
-            "alg": "ES256",
-            "kid": self.key_id
-        }
-        payload = {
-            "iss": self.team_id,
-            "iat": int(time.time())
+    @staticmethod
+    def build_payload(
+        title: str,
+        body: str,
+        data: Optional[dict] = None,
+        badge: Optional[int] = None,
+        sound: str = "default"
+    ) -> bytes:
+        """Encode a notification's JSON body; encode once and reuse it for every device."""
+        aps = {
+            "alert": {
+                "title": title,
+                "body": body
+            },
+            "sound": sound
         }
+        if badge is not None:
+            aps["badge"] = badge
 
-        self._token = jwt.encode(payload, private_key, algorithm="ES256", headers=headers)
-        self._token_expires = time.time() + 3500  # Token valid for ~1 hour
-
-        return self._token
+        payload = {"aps": aps}
+        if data:
+            payload.update(data)
+        return orjson.dumps(payload)
 
     async def send_notification(
         self,
@@ -78,6 +156,10 @@ class APNsService:
         sound: str = "default"
     ) -> bool:
         """Send a push notification to a single device."""
+        return await self.send_payload(device_token, self.build_payload(title, body, data, badge, sound))
+
+    async def send_payload(self, device_token: str, payload: bytes) -> bool:
+        """Send an already-encoded notification body to a single device."""
         has_key = bool(self.key_path or self.key_content)
         if not all([self.team_id, self.key_id, self.bundle_id, has_key]):
             print("APNs not configured, skipping push notification")
@@ -89,38 +171,20 @@ class APNsService:
             print(f"Failed to generate APNs token: {e}")
             return False
 
-        # Build payload
-        aps = {
-            "alert": {
-                "title": title,
-                "body": body
-            },
-            "sound": sound
-        }
-        if badge is not None:
-            aps["badge"] = badge
-
-        payload = {"aps": aps}
-        if data:
-            payload.update(data)
-
         # Send request
         url = f"{self.base_url}/3/device/{device_token}"
         headers = {
             "authorization": f"bearer {token}",
             "apns-topic": self.bundle_id,
             "apns-push-type": "alert",
-            "apns-priority": "10"
+            "apns-priority": "10",
+            "content-type": "application/json"
         }
 
-        async with httpx.AsyncClient(http2=True) as client:
+        client = self.client
+        async with self._streams:
             try:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=30.0
-                )
+                response = await client.post(url, content=payload, headers=headers)
 
                 if response.status_code == 200:
                     return True
@@ -132,6 +196,17 @@ class APNsService:
                 print(f"Failed to send push notification: {e}")
                 return False
 
+    async def send_payload_to_all(self, device_tokens: List[str], payload: bytes) -> int:
+        """Send one encoded notification to many devices, a batch at a time; returns successes."""
+        sent = 0
+        for start in range(0, len(device_tokens), self.FANOUT_BATCH_SIZE):
+            results = await asyncio.gather(*[
+                self.send_payload(device_token, payload)
+                for device_token in device_tokens[start:start + self.FANOUT_BATCH_SIZE]
+            ])
+            sent += sum(results)
+        return sent
+
     async def send_to_user(
         self,
         db: Session,
@@ -141,17 +216,24 @@ class APNsService:
         data: Optional[dict] = None
     ) -> int:
         """Send a push notification to all devices for a user."""
-        devices = db.query(DeviceToken).filter(
-            DeviceToken.user_id == user_id,
-            DeviceToken.platform == "ios"
-        ).all()
+        return await self.send_to_users(db, [user_id], title, body, data)
 
-        sent = 0
-        for device in devices:
-            if await self.send_notification(device.device_token, title, body, data):
-                sent += 1
+    async def send_to_users(
+        self,
+        db: Session,
+        user_ids: List[str],
+        title: str,
+        body: str,
+        data: Optional[dict] = None
+    ) -> int:
+        """Send the same push notification to every device of several users (one token query)."""
+        device_tokens = list(db.scalars(select(DeviceToken.device_token).where(
+            DeviceToken.user_id.in_(user_ids),
+            DeviceToken.platform == "ios"
+        )))
 
-        return sent
+        payload = self.build_payload(title, body, data)
+        return await self.send_payload_to_all(device_tokens, payload)
 
 
 class DeadlineNotificationService:
@@ -171,48 +253,78 @@ class DeadlineNotificationService:
             (1, "tomorrow")
         ]
 
+        # One query covering every window's calendar day, bucketed by days away
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_ranges = [
+            and_(
+                GrantProgram.deadline >= today + timedelta(days=days),
+                GrantProgram.deadline < today + timedelta(days=days + 1),
+            )
+            for days, _ in reminder_windows
+        ]
+        programs_by_days = {}
+        # Plain rows: the reminder only needs these columns, not ORM entities
+        for program in self.db.execute(select(GrantProgram.id, GrantProgram.name, GrantProgram.deadline).where(
+            GrantProgram.is_active.is_(True),
+            or_(*day_ranges)
+        )):
+            days = (program.deadline.date() - today.date()).days
+            programs_by_days.setdefault(days, []).append(program)
+
+        # Queries first, then every program in every window is sent in one multiplexed burst
+        reminders = []
         for days, time_text in reminder_windows:
-            target_date = now + timedelta(days=days)
-            start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-            programs = self.db.query(GrantProgram).filter(
-                GrantProgram.deadline >= start_of_day,
-                GrantProgram.deadline <= end_of_day,
-                GrantProgram.is_active.is_(True)
-            ).all()
-
-            for program in programs:
-                await self._send_deadline_reminder(program, time_text)
-
-    async def _send_deadline_reminder(self, program: GrantProgram, time_text: str):
-        """Send deadline reminder for a specific program to interested users."""
-        # Get all users with deadline_reminders enabled
-        from app.models.database import NotificationPreference
-
-        prefs = self.db.query(NotificationPreference).filter(
-            NotificationPreference.deadline_reminders.is_(True)
-        ).all()
-
-        user_ids = [p.user_id for p in prefs]
-
-        # Also include users without preferences (default is enabled)
-        all_user_ids = self.db.query(User.id).all()
-        users_with_prefs = set(user_ids)
-        default_users = [u.id for u in all_user_ids if u.id not in users_with_prefs]
-        user_ids.extend(default_users)
-
-        for user_id in user_ids:
-            await self.apns.send_to_user(
-                self.db,
-                user_id,
-                title="Grant Deadline Approaching",
-                body=f"{program.name} deadline is {time_text}. Don't miss out!",
-                data={
-                    "type": "deadline_reminder",
-                    "grantId": program.id
-                }
+            programs = programs_by_days.get(days)
+            if not programs:
+                continue
+
+            # Same audience for every program in the window: one query
+            device_tokens = self.reminder_device_tokens(days)
+            reminders.extend((program, time_text, device_tokens) for program in programs)
+
+        try:
+            results = await asyncio.gather(
+                *[self._send_deadline_reminder(*reminder) for reminder in reminders],
+                return_exceptions=True
             )
+        finally:
+            await self.apns.close()
+
+        for (program, _, _), result in zip(reminders, results):
+            if isinstance(result, Exception):
+                print(f"Failed to send deadline reminders for {program.id}: {result}")
+
+    def reminder_device_tokens(self, days: int) -> List[str]:
+        """iOS device tokens of users who want a deadline reminder `days` before a deadline.
+
+        Users without saved preferences get the defaults (reminders on, 7/3/1 days).
+        """
+        prefs = NotificationPreference
+        if self.db.get_bind().dialect.name == "postgresql":
+            wants_days = type_coerce(prefs.reminder_days_before, ARRAY(Integer)).contains([days])
+        else:
+            reminder_days = func.json_each(prefs.reminder_days_before).table_valued("value")
+            wants_days = exists(select(reminder_days.c.value).where(reminder_days.c.value == days))
+
+        stmt = select(DeviceToken.device_token).outerjoin(
+            prefs, prefs.user_id == DeviceToken.user_id
+        ).where(
+            DeviceToken.platform == "ios",
+            or_(prefs.id.is_(None), prefs.deadline_reminders.is_(True) & wants_days),
+        )
+        return list(self.db.scalars(stmt))
+
+    async def _send_deadline_reminder(self, program: Row, time_text: str, device_tokens: List[str]):
+        """Send deadline reminder for a specific program to interested users' devices."""
+        payload = self.apns.build_payload(
+            title="Grant Deadline Approaching",
+            body=f"{program.name} deadline is {time_text}. Don't miss out!",
+            data={
+                "type": "deadline_reminder",
+                "grantId": program.id
+            }
+        )
+        await self.apns.send_payload_to_all(device_tokens, payload)
 
     async def send_application_update(
         self,
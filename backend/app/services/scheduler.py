@@ -34,6 +34,11 @@ def start_scheduler():
         CronTrigger(hour=9, minute=0),
         id="deadline_reminders",
         name="Check and send deadline reminders",
+        # The default 1s grace silently skips the day's run if the loop is busy at 9:00;
+        # late runs within the hour still go out, but only once and never overlapping
+        misfire_grace_time=3600,
+        coalesce=True,
+        max_instances=1,
         replace_existing=True
     )
 
@@ -3,10 +3,13 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from datetime import datetime, timedelta
-from app.models.database import SessionLocal, GrantProgram, GrantCategory
+from datetime import datetime
+from sqlalchemy import select
+from app.api.programs import bulk_upsert_programs, sample_program_row
+from app.models.database import SessionLocal, GrantCategory, GrantProgram
 
-SAMPLE_PROGRAMS = [
+# Built once at import; deadlines are days from seeding time ("deadline_days")
+SAMPLE_PROGRAMS = (
     # Small Business
     {
         "id": "sba_7a",
@@ -46,7 +49,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.5,
         "description": "Grants to support organizations that provide business training and counseling to women entrepreneurs.",
         "eligibility_summary": "Must be a woman-owned small business or nonprofit serving women entrepreneurs.",
-        "deadline": datetime.now() + timedelta(days=90),
+        "deadline_days": 90,
         "rolling_deadline": False,
         "program_url": "https://www.sba.gov/local-assistance/womens-business-centers",
         "is_active": True,
@@ -62,7 +65,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Supports rural health clinics in improving quality of care, expanding services, and implementing new technologies.",
         "eligibility_summary": "Must be a certified Rural Health Clinic located in a designated rural area with demonstrated healthcare access needs.",
-        "deadline": datetime.now() + timedelta(days=60),
+        "deadline_days": 60,
         "rolling_deadline": False,
         "program_url": "https://www.hrsa.gov/rural-health",
         "is_active": True,
@@ -77,7 +80,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Funding to expand access to comprehensive primary health care services in underserved communities.",
         "eligibility_summary": "Must be a Federally Qualified Health Center (FQHC) or organization applying for FQHC status.",
-        "deadline": datetime.now() + timedelta(days=120),
+        "deadline_days": 120,
         "rolling_deadline": False,
         "program_url": "https://www.hrsa.gov/grants/find-funding",
         "is_active": True,
@@ -121,7 +124,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Scholarships for students pursuing degrees in science, technology, engineering, and mathematics fields.",
         "eligibility_summary": "Must be enrolled full-time in a STEM program, maintain 3.0 GPA, and demonstrate financial need.",
-        "deadline": datetime.now() + timedelta(days=45),
+        "deadline_days": 45,
         "rolling_deadline": False,
         "program_url": "https://www.nsf.gov/funding/",
         "is_active": True,
@@ -137,7 +140,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.25,
         "description": "Funding to strengthen nonprofit organizations' ability to achieve their missions through improved operations and programs.",
         "eligibility_summary": "Must be a 501(c)(3) organization with at least 2 years of operation and demonstrated community impact.",
-        "deadline": datetime.now() + timedelta(days=75),
+        "deadline_days": 75,
         "rolling_deadline": False,
         "program_url": "https://americorps.gov/grants",
         "is_active": True,
@@ -152,7 +155,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Flexible funding to address community development needs including housing, economic development, and public services.",
         "eligibility_summary": "Must be a local government or nonprofit serving low-to-moderate income communities.",
-        "deadline": datetime.now() + timedelta(days=100),
+        "deadline_days": 100,
         "rolling_deadline": False,
         "program_url": "https://www.hud.gov/program_offices/comm_planning/cdbg",
         "is_active": True,
@@ -168,7 +171,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.5,
         "description": "Grants to help agricultural producers enter into value-added activities, develop new products, and expand marketing.",
         "eligibility_summary": "Must be an independent agricultural producer, farmer cooperative, or majority-controlled producer-based business.",
-        "deadline": datetime.now() + timedelta(days=80),
+        "deadline_days": 80,
         "rolling_deadline": False,
         "program_url": "https://www.rd.usda.gov/programs-services/business-programs/value-added-producer-grants",
         "is_active": True,
@@ -198,7 +201,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Funding for small businesses to conduct R&D with commercial potential. Phase I establishes feasibility.",
         "eligibility_summary": "Must be a US small business with fewer than 500 employees. Principal investigator must be primarily employed by the company.",
-        "deadline": datetime.now() + timedelta(days=65),
+        "deadline_days": 65,
         "rolling_deadline": False,
         "program_url": "https://www.sbir.gov/",
         "is_active": True,
@@ -213,7 +216,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.0,
         "description": "Funding for small businesses partnering with research institutions to move innovations from lab to market.",
         "eligibility_summary": "Must be a US small business partnering with a nonprofit research institution. At least 40% of work at small business, 30% at research institution.",
-        "deadline": datetime.now() + timedelta(days=55),
+        "deadline_days": 55,
         "rolling_deadline": False,
         "program_url": "https://www.sbir.gov/about/about-sttr",
         "is_active": True,
@@ -229,7 +232,7 @@ SAMPLE_PROGRAMS = [
         "match_required": 0.25,
         "description": "Grants to fund affordable housing activities including building, buying, and rehabilitating affordable housing.",
         "eligibility_summary": "Must be a state, local government, or designated Community Housing Development Organization (CHDO).",
-        "deadline": datetime.now() + timedelta(days=110),
+        "deadline_days": 110,
         "rolling_deadline": False,
         "program_url": "https://www.hud.gov/program_offices/comm_planning/home",
         "is_active": True,
@@ -248,26 +251,26 @@ SAMPLE_PROGRAMS = [
         "program_url": "https://www.rd.usda.gov/programs-services/single-family-housing-programs/single-family-housing-repair-loans-grants",
         "is_active": True,
     },
-]
+)
 
 
 def seed_programs():
-    """Seed sample grant programs."""
+    """Seed sample grant programs, updating any that already exist."""
     db = SessionLocal()
     try:
-        added = 0
-        for program_data in SAMPLE_PROGRAMS:
-            existing = db.query(GrantProgram).filter(GrantProgram.id == program_data["id"]).first()
-            if not existing:
-                program = GrantProgram(**program_data)
-                db.add(program)
-                added += 1
-                print(f"  + {program_data['name']}")
-            else:
-                print(f"  = {program_data['name']} (exists)")
+        # One id-only query tells new programs from updated ones for the log
+        ids = [program_data["id"] for program_data in SAMPLE_PROGRAMS]
+        existing = set(db.scalars(select(GrantProgram.id).where(GrantProgram.id.in_(ids))))
 
+        now = datetime.now()
+        count = bulk_upsert_programs(db, [sample_program_row(data, now) for data in SAMPLE_PROGRAMS])
         db.commit()
-        print(f"\nSeeded {added} new programs ({len(SAMPLE_PROGRAMS)} total)")
+        for program_data in SAMPLE_PROGRAMS:
+            if program_data["id"] in existing:
+                print(f"  = {program_data['name']} (updated)")
+            else:
+                print(f"  + {program_data['name']}")
+        print(f"\nSeeded {count - len(existing)} new programs ({count} total)")
     finally:
         db.close()
 
@@ -1,12 +1,25 @@
 """Pytest fixtures for API tests."""
+import asyncio
+import os
+from contextlib import contextmanager
+
+# Must be set before settings load.
+# Minimum bcrypt cost: every auth_headers registration hashes a password, and at the
+# production cost of 12 hashing dominates the suite.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The app's own engine (used by lifespan startup) stays in memory too, so test runs never
+# share a database file with each other or with a dev server, e.g. under pytest -n.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.models.database import Base, get_db, GrantProgram, GrantCategory
+from app.api.programs import clear_program_cache
+from app.models.database import Base, get_db, GrantProgram, GrantCategory, User, UserProfile
 
 
 # Test database setup
@@ -17,7 +30,26 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Each test class runs inside one outer transaction and each test inside a SAVEPOINT of it,
+# both rolled back afterwards; sessions join through further SAVEPOINTs, so their commits
+# and rollbacks never reach the database.
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, join_transaction_mode="create_savepoint"
+)
+
+# Isolation bookkeeping, left out of captured statements
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself; pysqlite's implicit transactions break SAVEPOINT."""
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
 def override_get_db():
@@ -29,25 +61,87 @@ def override_get_db():
         db.close()
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database for each test."""
+@contextmanager
+def capture_statements():
+    """Collect the SQL executed inside the block (excluding test SAVEPOINTs)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def concurrency_probe(fake, delay=0.01):
+    """
+    Wrap an async fake so each call stays in flight for `delay` seconds first.
+
+    Returns the wrapper and a function reading the most calls seen in flight at once.
+    """
+    in_flight = 0
+    peak = 0
+
+    async def probe(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            in_flight -= 1
+        return await fake(*args, **kwargs)
+
+    return probe, lambda: peak
+
+
+@pytest.fixture(scope="session")
+def database_schema():
+    """Create the tables once for the whole run."""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="class")
+def db_connection(database_schema):
+    """Connection inside a per-class transaction that is rolled back afterwards."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def db_session(db_connection):
+    """Session inside a per-test SAVEPOINT, so class-scoped seed data outlives it."""
+    savepoint = db_connection.begin_nested()
+    TestingSessionLocal.configure(bind=db_connection)
     db = TestingSessionLocal()
     yield db
     db.close()
-    Base.metadata.drop_all(bind=engine)
+    savepoint.rollback()
 
 
-@pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database override."""
-    app.dependency_overrides[get_db] = override_get_db
-    Base.metadata.create_all(bind=engine)
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient for the run, so the app's lifespan startup happens once."""
     with TestClient(app) as test_client:
         yield test_client
-    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(app_client, db_session):
+    """Test client whose requests use this test's database transaction."""
+    app.dependency_overrides[get_db] = override_get_db
+    yield app_client
     app.dependency_overrides.clear()
+    clear_program_cache()
 
 
 @pytest.fixture
@@ -68,6 +162,20 @@ def auth_headers(client, test_user_data):
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture
+def current_user(auth_headers, db_session, test_user_data):
+    """The user registered by auth_headers."""
+    return db_session.query(User).filter(User.email == test_user_data["email"]).one()
+
+
+def seed_profile(db_session, user, **fields):
+    """Save a profile straight to the database (tests not about the PATCH endpoint)."""
+    profile = UserProfile(user_id=user.id, **fields)
+    db_session.add(profile)
+    db_session.commit()
+    return profile
+
+
 @pytest.fixture
 def sample_program(db_session):
     """Create a sample grant program."""
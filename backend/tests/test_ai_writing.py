@@ -0,0 +1,147 @@
+"""Tests for the AI writing service."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai_writing import AIWritingService, narrative_cache_key
+from tests.conftest import concurrency_probe
+
+
+def fake_gemini_client(calls, fail_after=None):
+    """A client stand-in whose async generate_content records each prompt.
+
+    With fail_after, the stream raises after yielding that many chunks.
+    """
+    async def generate_content(model, contents):
+        calls.append(contents)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(text=f" narrative {len(calls)} ")
+
+    async def generate_content_stream(model, contents):
+        calls.append(contents)
+
+        async def chunks():
+            for i, text in enumerate(("  First part, ", "second part.")):
+                if i == fail_after:
+                    raise RuntimeError("stream dropped")
+                yield SimpleNamespace(text=text)
+
+        return chunks()
+
+    return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        generate_content=generate_content, generate_content_stream=generate_content_stream
+    )))
+
+
+class TestGenerateApplicationSections:
+    """Tests for generating every application section."""
+
+    def test_sections_generated_concurrently(self, monkeypatch):
+        """Test that sections overlap in time but come back in document order."""
+        service = AIWritingService()
+
+        async def fake_generate_narrative(section_type, context, max_words=500, tone="professional"):
+            return section_type.upper()
+
+        probe, peak = concurrency_probe(fake_generate_narrative)
+        monkeypatch.setattr(service, "generate_narrative", probe)
+        sections = asyncio.run(service.generate_application_sections({}, {}))
+
+        assert list(sections) == [section_type for section_type, _ in service.SECTION_TYPES]
+        assert sections["executive_summary"] == "EXECUTIVE_SUMMARY"
+        assert peak() > 1
+
+    def test_failed_section_uses_fallback(self, monkeypatch):
+        """Test that one failing section falls back without losing the others."""
+        service = AIWritingService()
+
+        async def flaky_generate_narrative(section_type, context, max_words=500, tone="professional"):
+            if section_type == "budget_justification":
+                raise RuntimeError("rate limited")
+            return "generated"
+
+        monkeypatch.setattr(service, "generate_narrative", flaky_generate_narrative)
+        sections = asyncio.run(service.generate_application_sections({"organization_name": "Acme"}, {}))
+
+        assert sections["executive_summary"] == "generated"
+        assert sections["budget_justification"].startswith("Personnel:")
+
+
+class TestNarrativeCache:
+    """Tests for memoizing generated narratives."""
+
+    def test_cache_key_ignores_context_order(self):
+        """Test that the fingerprint doesn't depend on dict insertion order."""
+        first = narrative_cache_key("executive_summary", {"a": 1, "b": 2}, 200, "professional")
+        second = narrative_cache_key("executive_summary", {"b": 2, "a": 1}, 200, "professional")
+        assert first == second
+        assert first != narrative_cache_key("executive_summary", {"a": 1, "b": 2}, 300, "professional")
+
+    def test_repeat_generation_served_from_cache(self):
+        """Test that an identical request doesn't call Gemini again."""
+        calls = []
+        service = AIWritingService()
+        service.client = fake_gemini_client(calls)
+        context = {"organization_name": "Cache Repeat Org"}
+
+        first = asyncio.run(service.generate_narrative("executive_summary", context))
+        second = asyncio.run(service.generate_narrative("executive_summary", context))
+
+        assert first == second == "narrative 1"
+        assert len(calls) == 1
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        """Test that simultaneous identical requests wait on a single generation."""
+        calls = []
+        service = AIWritingService()
+        service.client = fake_gemini_client(calls)
+        context = {"organization_name": "Cache Concurrent Org"}
+
+        async def generate_twice():
+            return await asyncio.gather(
+                service.generate_narrative("statement_of_need", context),
+                service.generate_narrative("statement_of_need", context),
+            )
+
+        assert asyncio.run(generate_twice()) == ["narrative 1", "narrative 1"]
+        assert len(calls) == 1
+
+
+class TestGenerateNarrativeStream:
+    """Tests for streaming a single narrative section."""
+
+    def test_stream_yields_chunks_and_caches_result(self):
+        """Test that chunks arrive as generated and the joined text is cached."""
+        calls = []
+        service = AIWritingService()
+        service.client = fake_gemini_client(calls)
+        context = {"organization_name": "Stream Org"}
+
+        async def collect():
+            return [chunk async for chunk in service.generate_narrative_stream("project_description", context)]
+
+        assert asyncio.run(collect()) == ["First part, ", "second part."]
+        assert asyncio.run(collect()) == ["First part, second part."]
+        assert asyncio.run(service.generate_narrative("project_description", context)) == "First part, second part."
+        assert len(calls) == 1
+
+    def test_stream_failure_after_first_chunk_raises(self):
+        """Test that a mid-stream failure is re-raised and the partial text isn't cached."""
+        calls = []
+        service = AIWritingService()
+        service.client = fake_gemini_client(calls, fail_after=1)
+        context = {"organization_name": "Dropped Stream Org"}
+        received = []
+
+        async def collect():
+            async for chunk in service.generate_narrative_stream("project_description", context):
+                received.append(chunk)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(collect())
+        assert received == ["First part, "]
+
+        service.client = fake_gemini_client(calls)
+        asyncio.run(collect())
+        assert len(calls) == 2
@@ -1,7 +1,15 @@
 """Tests for application endpoints."""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
 import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
-from app.models.database import GrantProgram, GrantCategory
+from app.models.database import Application, ApplicationStatus, GrantProgram, User, GrantCategory
+from app.services.ai_writing import get_ai_writing_service
+from tests.conftest import capture_statements
 
 
 @pytest.fixture
@@ -35,6 +43,8 @@ class TestCreateApplication:
         assert data["program_name"] == program_for_application.name
         assert data["status"] == "draft"
         assert data["completeness_score"] == 0
+        assert datetime.fromisoformat(data["created_at"]) <= datetime.fromisoformat(data["updated_at"])
+        assert data["submitted_at"] is None
 
     def test_create_application_duplicate(self, client, auth_headers, program_for_application):
         """Test that duplicate draft applications are rejected."""
@@ -63,6 +73,53 @@ class TestCreateApplication:
         )
         assert response.status_code == 404
 
+    def test_duplicate_draft_rejected_by_database(self, db_session, program_for_application):
+        """Test that the partial unique index allows only one draft per program."""
+        test_user = User(email="drafts@example.com", hashed_password="x")
+        db_session.add(test_user)
+        db_session.commit()
+        db_session.add(Application(user_id=test_user.id, program_id=program_for_application.id))
+        db_session.commit()
+
+        db_session.add(Application(user_id=test_user.id, program_id=program_for_application.id))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+
+        db_session.add(Application(user_id=test_user.id, program_id=program_for_application.id,
+                                   status=ApplicationStatus.SUBMITTED))
+        db_session.commit()
+
+    def test_reopening_submitted_application_beside_draft_rejected(self, client, auth_headers, program_for_application):
+        """Test that moving an application back to draft fails cleanly when another draft exists."""
+        submitted = client.post(
+            "/api/applications/", json={"program_id": program_for_application.id}, headers=auth_headers
+        ).json()["id"]
+        client.patch(f"/api/applications/{submitted}", json={"status": "submitted"}, headers=auth_headers)
+        response = client.post(
+            "/api/applications/", json={"program_id": program_for_application.id}, headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        response = client.patch(f"/api/applications/{submitted}", json={"status": "draft"}, headers=auth_headers)
+        assert response.status_code == 400
+        assert "draft" in response.json()["detail"]
+        assert client.get(f"/api/applications/{submitted}", headers=auth_headers).json()["status"] == "submitted"
+
+    def test_application_id_stored_as_16_bytes(self, client, auth_headers, db_session, program_for_application):
+        """Test that ids are UUID strings in the API but compact binary in the database."""
+        response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = response.json()["id"]
+        assert len(app_id) == 36
+
+        stored = db_session.execute(text("SELECT id, user_id FROM applications")).one()
+        assert len(stored.id) == len(stored.user_id) == 16
+        assert db_session.get(Application, app_id).id == app_id
+
     def test_create_application_unauthenticated(self, client, program_for_application):
         """Test that unauthenticated users cannot create applications."""
         response = client.post(
@@ -117,6 +174,41 @@ class TestListApplications:
         assert response.status_code == 200
         assert response.json()["total"] == 0
 
+    def test_list_applications_ndjson(self, client, auth_headers, program_for_application):
+        """Test streaming the application list as newline-delimited JSON."""
+        client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+
+        response = client.get("/api/applications/?format=ndjson", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["program_name"] == program_for_application.name
+        assert rows[0] == client.get("/api/applications/", headers=auth_headers).json()["applications"][0]
+
+    def test_list_applications_no_n_plus_one(self, client, auth_headers, db_session):
+        """Test that program names are loaded in the same query as applications."""
+        programs = [
+            GrantProgram(id=f"n1_program_{i}", name=f"Program {i}",
+                         category=GrantCategory.SMALL_BUSINESS, is_active=True)
+            for i in range(3)
+        ]
+        db_session.add_all(programs)
+        db_session.commit()
+        for program in programs:
+            client.post("/api/applications/", json={"program_id": program.id}, headers=auth_headers)
+
+        with capture_statements() as statements:
+            response = client.get("/api/applications/", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 3
+        assert not [s for s in statements if "FROM grant_programs" in s]
+
 
 class TestUpdateApplication:
     """Tests for updating applications."""
@@ -158,6 +250,12 @@ class TestUpdateApplication:
         )
         assert response.status_code == 200
 
+        response = client.get(f"/api/applications/{app_id}/form-data", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["form_data"] == {"project_title": "My Project"}
+        assert data["program_name"] == program_for_application.name
+
     def test_update_application_not_found(self, client, auth_headers):
         """Test updating non-existent application."""
         response = client.patch(
@@ -168,6 +266,141 @@ class TestUpdateApplication:
         assert response.status_code == 404
 
 
+class TestGenerateNarratives:
+    """Tests for generating application narratives."""
+
+    def test_generate_narratives_saved_to_form_data(self, client, auth_headers, program_for_application):
+        """Test that generated sections are returned and stored on the application."""
+        client.patch("/api/users/profile", json={"organization_name": "Helping Hands"}, headers=auth_headers)
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+
+        response = client.post(f"/api/applications/{app_id}/generate-narratives", headers=auth_headers)
+        assert response.status_code == 200
+        sections = response.json()["sections"]
+        assert "executive_summary" in sections
+        assert "Helping Hands" in sections["executive_summary"]
+
+        form_data = client.get(f"/api/applications/{app_id}/form-data", headers=auth_headers).json()
+        assert form_data["form_data"]["narratives"] == sections
+
+    def test_generate_narratives_stream(self, client, auth_headers, program_for_application):
+        """Test that streamed sections arrive as SSE events and are saved at the end."""
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+
+        response = client.post(
+            f"/api/applications/{app_id}/generate-narratives?stream=true", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines()
+                  if line.startswith("data: ") and line != "data: {}"]
+        sections = {event["section"]: event["text"] for event in events}
+        assert list(sections)[0] == "executive_summary"
+        assert response.text.rstrip().endswith("data: {}")
+
+        form_data = client.get(f"/api/applications/{app_id}/form-data", headers=auth_headers).json()
+        assert form_data["form_data"]["narratives"] == sections
+
+    def test_generate_single_section_stream(self, client, auth_headers, program_for_application):
+        """Test streaming one section as plain text and saving it alongside the others."""
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+
+        response = client.post(
+            f"/api/applications/{app_id}/generate-narratives/statement_of_need", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text
+
+        form_data = client.get(f"/api/applications/{app_id}/form-data", headers=auth_headers).json()
+        assert form_data["form_data"]["narratives"] == {"statement_of_need": response.text.strip()}
+
+    def test_generate_single_section_stream_failure_keeps_saved_text(
+        self, client, auth_headers, program_for_application, monkeypatch
+    ):
+        """Test that a stream cut off partway doesn't overwrite the saved section."""
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+        narratives = {"narratives": {"statement_of_need": "Good text"}}
+        client.patch(f"/api/applications/{app_id}", json={"form_data": narratives}, headers=auth_headers)
+
+        async def generate_content_stream(model, contents):
+            async def chunks():
+                yield SimpleNamespace(text="Partial ")
+                raise RuntimeError("stream dropped")
+            return chunks()
+
+        fake_client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+            generate_content_stream=generate_content_stream
+        )))
+        monkeypatch.setattr(get_ai_writing_service(), "client", fake_client)
+        with pytest.raises(RuntimeError):
+            client.post(f"/api/applications/{app_id}/generate-narratives/statement_of_need", headers=auth_headers)
+
+        form_data = client.get(f"/api/applications/{app_id}/form-data", headers=auth_headers).json()
+        assert form_data["form_data"] == narratives
+
+    def test_generate_single_section_unknown(self, client, auth_headers, program_for_application):
+        """Test that an unknown section name is rejected."""
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+
+        response = client.post(f"/api/applications/{app_id}/generate-narratives/haiku", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_generate_narratives_not_found(self, client, auth_headers):
+        """Test generating narratives for a non-existent application."""
+        response = client.post("/api/applications/nonexistent/generate-narratives", headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestApplicationPdf:
+    """Tests for downloading an application as PDF."""
+
+    def test_download_application_pdf(self, client, auth_headers, program_for_application):
+        """Test that the draft application PDF is streamed back."""
+        create_response = client.post(
+            "/api/applications/",
+            json={"program_id": program_for_application.id},
+            headers=auth_headers
+        )
+        app_id = create_response.json()["id"]
+
+        response = client.get(f"/api/applications/{app_id}/pdf", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert "content-encoding" not in response.headers
+        assert response.content.startswith(b"%PDF")
+
+    def test_download_application_pdf_not_found(self, client, auth_headers):
+        """Test downloading a PDF for a non-existent application."""
+        response = client.get("/api/applications/nonexistent/pdf", headers=auth_headers)
+        assert response.status_code == 404
+
+
 class TestDeleteApplication:
     """Tests for deleting applications."""
 
@@ -1,6 +1,9 @@
 """Tests for authentication endpoints."""
 import pytest
 
+from app.config.settings import get_settings
+from app.models.database import User
+
 
 class TestRegistration:
     """Tests for user registration."""
@@ -59,6 +62,25 @@ class TestLogin:
         assert response.status_code == 401
         assert response.headers.get("WWW-Authenticate") == "Bearer"
 
+    def test_login_rehashes_password_with_new_cost(self, client, db_session, test_user_data, monkeypatch):
+        """Test that a hash made with an outdated cost is upgraded on login."""
+        def use_bcrypt_rounds(rounds):
+            settings = get_settings().model_copy(update={"bcrypt_rounds": rounds})
+            monkeypatch.setattr("app.api.auth.get_settings", lambda: settings)
+
+        use_bcrypt_rounds(4)
+        client.post("/api/auth/register", json=test_user_data)
+
+        use_bcrypt_rounds(5)
+        response = client.post("/api/auth/token", data={
+            "username": test_user_data["email"],
+            "password": test_user_data["password"]
+        })
+        assert response.status_code == 200
+
+        user = db_session.query(User).filter(User.email == test_user_data["email"]).one()
+        assert user.hashed_password.startswith("$2b$05$")
+
     def test_login_nonexistent_user(self, client):
         """Test login with non-existent user."""
         response = client.post("/api/auth/token", data={
@@ -68,6 +90,30 @@ class TestLogin:
         assert response.status_code == 401
 
 
+class TestLogout:
+    """Tests for revoking tokens."""
+
+    def test_logout_revokes_token(self, client, auth_headers):
+        """Test that a token stops working after logout."""
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+        response = client.post("/api/auth/logout", headers=auth_headers)
+        assert response.status_code == 200
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
+
+    def test_logout_keeps_other_tokens(self, client, auth_headers, test_user_data):
+        """Test that logging out one session leaves other tokens valid."""
+        login = client.post("/api/auth/token", data={
+            "username": test_user_data["email"],
+            "password": test_user_data["password"]
+        })
+        other_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        assert other_headers != auth_headers
+
+        client.post("/api/auth/logout", headers=auth_headers)
+        assert client.get("/api/auth/me", headers=other_headers).status_code == 200
+
+
 class TestMe:
     """Tests for /me endpoint."""
 
@@ -81,3 +127,18 @@ class TestMe:
         """Test getting current user without auth."""
         response = client.get("/api/auth/me")
         assert response.status_code == 401
+
+
+class TestProtectedEndpoints:
+    """Tests that user-scoped endpoints require a token."""
+
+    @pytest.mark.parametrize("method,url,body", [
+        ("get", "/api/eligibility/check", None),
+        ("get", "/api/eligibility/check/sba_small_biz", None),
+        ("get", "/api/users/profile", None),
+        ("patch", "/api/users/profile", {"full_name": "Test"}),
+    ])
+    def test_unauthenticated_request_rejected(self, client, method, url, body):
+        """Test that requests without a token get 401."""
+        response = client.request(method, url, json=body)
+        assert response.status_code == 401
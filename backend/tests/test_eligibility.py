@@ -1,30 +1,26 @@
 """Tests for eligibility endpoints."""
+from itertools import pairwise
+
 import pytest
+from sqlalchemy import insert
 
 from app.models.database import GrantProgram, GrantCategory
+from tests.conftest import capture_statements, seed_profile
+
+# Every eligibility result carries these
+RESULT_FIELDS = {"program_id", "eligible", "match_score", "missing_requirements"}
 
 
-@pytest.fixture
-def eligibility_programs(db_session):
-    """Create programs for eligibility testing."""
+@pytest.fixture(scope="class")
+def eligibility_programs(db_connection):
+    """Create programs for eligibility testing, once per test class."""
     programs = [
-        GrantProgram(
-            id="sba_small_biz",
-            name="SBA Small Business Grant",
-            agency="SBA",
-            category=GrantCategory.SMALL_BUSINESS,
-            is_active=True,
-        ),
-        GrantProgram(
-            id="usda_rural",
-            name="USDA Rural Development",
-            agency="USDA",
-            category=GrantCategory.AGRICULTURE,
-            is_active=True,
-        ),
+        {"id": "sba_small_biz", "name": "SBA Small Business Grant", "agency": "SBA",
+         "category": GrantCategory.SMALL_BUSINESS, "is_active": True},
+        {"id": "usda_rural", "name": "USDA Rural Development", "agency": "USDA",
+         "category": GrantCategory.AGRICULTURE, "is_active": True},
     ]
-    db_session.add_all(programs)
-    db_session.commit()
+    db_connection.execute(insert(GrantProgram), programs)
     return programs
 
 
@@ -39,23 +35,19 @@ class TestCheckEligibility:
         assert data["total_programs"] == 0
         assert data["eligible_count"] == 0
 
-    def test_check_eligibility_with_profile(self, client, auth_headers, eligibility_programs):
+    def test_check_eligibility_with_profile(self, client, auth_headers, db_session, current_user, eligibility_programs):
         """Test eligibility check with profile data."""
-        # Create a profile first
-        client.patch(
-            "/api/users/profile",
-            json={
-                "full_name": "John Doe",
-                "organization_name": "Small Biz Inc",
-                "address": "123 Main St",
-                "city": "Austin",
-                "state": "TX",
-                "zip_code": "78701",
-                "ein": "12-3456789",
-                "annual_revenue": 500000,
-                "employee_count": 10,
-            },
-            headers=auth_headers
+        seed_profile(
+            db_session, current_user,
+            full_name="John Doe",
+            organization_name="Small Biz Inc",
+            address="123 Main St",
+            city="Austin",
+            state="TX",
+            zip_code="78701",
+            ein="12-3456789",
+            annual_revenue=500000,
+            employee_count=10,
         )
 
         response = client.get("/api/eligibility/check", headers=auth_headers)
@@ -63,27 +55,18 @@ class TestCheckEligibility:
         data = response.json()
         assert data["total_programs"] == 2
         assert len(data["programs"]) == 2
-        # Each program should have eligibility info
-        for program in data["programs"]:
-            assert "program_id" in program
-            assert "eligible" in program
-            assert "match_score" in program
-            assert "missing_requirements" in program
-
-    def test_check_eligibility_sorted_by_score(self, client, auth_headers, eligibility_programs):
+        assert all(RESULT_FIELDS <= program.keys() for program in data["programs"])
+
+    def test_check_eligibility_sorted_by_score(self, client, auth_headers, db_session, current_user, eligibility_programs):
         """Test that results are sorted by match score descending."""
-        # Create profile
-        client.patch(
-            "/api/users/profile",
-            json={
-                "full_name": "Jane Doe",
-                "organization_name": "Test Org",
-                "address": "456 Oak Ave",
-                "city": "Dallas",
-                "state": "TX",
-                "zip_code": "75001",
-            },
-            headers=auth_headers
+        seed_profile(
+            db_session, current_user,
+            full_name="Jane Doe",
+            organization_name="Test Org",
+            address="456 Oak Ave",
+            city="Dallas",
+            state="TX",
+            zip_code="75001",
         )
 
         response = client.get("/api/eligibility/check", headers=auth_headers)
@@ -92,49 +75,78 @@ class TestCheckEligibility:
 
         # Verify sorted by match_score descending
         scores = [p["match_score"] for p in programs]
-        assert scores == sorted(scores, reverse=True)
+        assert all(a >= b for a, b in pairwise(scores))
+
+    def test_check_eligibility_reflects_profile_update(self, client, auth_headers, eligibility_programs):
+        """Test that cached results are refreshed after the profile changes."""
+        client.patch("/api/users/profile", json={"full_name": "Jane Doe"}, headers=auth_headers)
+        first = client.get("/api/eligibility/check", headers=auth_headers).json()
+
+        client.patch(
+            "/api/users/profile",
+            json={"organization_name": "Test Org", "ein": "12-3456789"},
+            headers=auth_headers
+        )
+        second = client.get("/api/eligibility/check", headers=auth_headers).json()
 
-    def test_check_eligibility_unauthenticated(self, client):
-        """Test that unauthenticated users cannot check eligibility."""
-        response = client.get("/api/eligibility/check")
-        assert response.status_code == 401
+        first_scores = {p["program_id"]: p["match_score"] for p in first["programs"]}
+        second_scores = {p["program_id"]: p["match_score"] for p in second["programs"]}
+        assert all(second_scores[pid] > first_scores[pid] for pid in first_scores)
+
+    def test_check_eligibility_limit(self, client, auth_headers, db_session, current_user, eligibility_programs):
+        """Test that limit returns the top matches but counts every program."""
+        seed_profile(db_session, current_user, organization_name="Test Org")
+
+        full = client.get("/api/eligibility/check", headers=auth_headers).json()
+        response = client.get("/api/eligibility/check?limit=1", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_programs"] == full["total_programs"] == 2
+        assert data["eligible_count"] == full["eligible_count"]
+        assert data["programs"] == full["programs"][:1]
+
+    def test_check_eligibility_limit_served_from_cache(self, client, auth_headers, db_session, current_user, eligibility_programs):
+        """Test that any limit is sliced from the cached ranking without rescoring."""
+        seed_profile(db_session, current_user, organization_name="Test Org")
+        full = client.get("/api/eligibility/check", headers=auth_headers).json()
+
+        with capture_statements() as statements:
+            for limit in (1, 2, 3):
+                data = client.get(f"/api/eligibility/check?limit={limit}", headers=auth_headers).json()
+                assert data["programs"] == full["programs"][:limit]
+
+        assert not any("grant_programs" in statement for statement in statements)
 
 
 class TestCheckProgramEligibility:
     """Tests for checking eligibility for a specific program."""
 
-    def test_check_program_eligibility(self, client, auth_headers, eligibility_programs):
+    def test_check_program_eligibility(self, client, auth_headers, db_session, current_user, eligibility_programs):
         """Test checking eligibility for a specific program."""
-        # Create profile
-        client.patch(
-            "/api/users/profile",
-            json={
-                "full_name": "Test User",
-                "organization_name": "Test Business",
-                "address": "789 Pine St",
-                "city": "Houston",
-                "state": "TX",
-                "zip_code": "77001",
-                "ein": "98-7654321",
-            },
-            headers=auth_headers
+        seed_profile(
+            db_session, current_user,
+            full_name="Test User",
+            organization_name="Test Business",
+            address="789 Pine St",
+            city="Houston",
+            state="TX",
+            zip_code="77001",
+            ein="98-7654321",
         )
 
         response = client.get(
-            f"/api/eligibility/check/{eligibility_programs[0].id}",
+            f"/api/eligibility/check/{eligibility_programs[0]['id']}",
             headers=auth_headers
         )
         assert response.status_code == 200
         data = response.json()
-        assert data["program_id"] == eligibility_programs[0].id
-        assert "eligible" in data
-        assert "match_score" in data
-        assert "missing_requirements" in data
+        assert data["program_id"] == eligibility_programs[0]["id"]
+        assert RESULT_FIELDS <= data.keys()
 
     def test_check_program_eligibility_no_profile(self, client, auth_headers, eligibility_programs):
         """Test checking program eligibility with no profile."""
         response = client.get(
-            f"/api/eligibility/check/{eligibility_programs[0].id}",
+            f"/api/eligibility/check/{eligibility_programs[0]['id']}",
             headers=auth_headers
         )
         assert response.status_code == 200
@@ -151,7 +163,31 @@ class TestCheckProgramEligibility:
         )
         assert response.status_code == 404
 
-    def test_check_program_eligibility_unauthenticated(self, client, eligibility_programs):
-        """Test that unauthenticated users cannot check program eligibility."""
-        response = client.get(f"/api/eligibility/check/{eligibility_programs[0].id}")
-        assert response.status_code == 401
+    def test_bulk_check_matches_single_program_check(self, client, auth_headers, db_session, current_user, eligibility_programs):
+        """Test that the all-programs check agrees with per-program checks."""
+        seed_profile(db_session, current_user, organization_name="Farm Co", city="Ames", state="IA")
+
+        bulk = client.get("/api/eligibility/check", headers=auth_headers).json()["programs"]
+        for result in bulk:
+            single = client.get(
+                f"/api/eligibility/check/{result['program_id']}", headers=auth_headers
+            ).json()
+            assert single == result
+
+    def test_check_program_eligibility_penalties(self, client, auth_headers, db_session, current_user, eligibility_programs):
+        """Test the score and missing requirements for a sparse profile."""
+        seed_profile(db_session, current_user, full_name="Jane Doe")
+
+        response = client.get("/api/eligibility/check/sba_small_biz", headers=auth_headers)
+        data = response.json()
+        assert data["match_score"] == 5
+        assert data["eligible"] is False
+        assert data["missing_requirements"] == [
+            "Organization name required",
+            "EIN (Tax ID) required for federal grants",
+            "Complete address required",
+            "SAM.gov registration required",
+            "UEI number required for federal grants",
+            "Annual revenue information needed",
+            "Employee count needed",
+        ]
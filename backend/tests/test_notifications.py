@@ -0,0 +1,220 @@
+"""Tests for notification endpoints."""
+import asyncio
+from datetime import datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.models.database import DeviceToken, GrantCategory, GrantProgram, NotificationPreference, User
+from app.services.push_notifications import APNsService, DeadlineNotificationService
+from tests.conftest import capture_statements, concurrency_probe
+
+
+class TestDeviceRegistration:
+    """Tests for registering push notification devices."""
+
+    def test_register_device_twice_upserts(self, client, auth_headers, db_session):
+        """Test that re-registering a token updates the existing row."""
+        device = {"device_token": "abc123", "platform": "ios"}
+
+        response = client.post("/api/notifications/device", json=device, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["message"] == "Device registered successfully"
+        first_seen = db_session.query(DeviceToken).one().updated_at
+
+        response = client.post("/api/notifications/device", json=device, headers=auth_headers)
+        assert response.json()["message"] == "Device token updated"
+        db_session.expire_all()
+        token = db_session.query(DeviceToken).one()
+        assert token.updated_at > first_seen
+        assert token.created_at < token.updated_at
+
+
+class TestPreferences:
+    """Tests for notification preferences."""
+
+    def test_get_preferences_defaults(self, client, auth_headers):
+        """Test that defaults are returned before any preferences are saved."""
+        response = client.get("/api/notifications/preferences", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["reminder_days_before"] == [7, 3, 1]
+
+    def test_update_preferences_round_trip(self, client, auth_headers):
+        """Test that saved reminder days are read back."""
+        response = client.patch(
+            "/api/notifications/preferences",
+            json={"new_grant_alerts": True, "reminder_days_before": [14, 2]},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        data = client.get("/api/notifications/preferences", headers=auth_headers).json()
+        assert data["new_grant_alerts"] is True
+        assert data["reminder_days_before"] == [14, 2]
+
+
+class TestDeadlineReminderRecipients:
+    """Tests for choosing who gets a deadline reminder."""
+
+    def test_recipients_follow_reminder_days(self, db_session):
+        """Test that saved reminder days and opt-outs are honoured, with defaults for the rest."""
+        users = {name: User(email=f"{name}@example.com", hashed_password="x")
+                 for name in ("default", "weekly", "opted_out")}
+        db_session.add_all(users.values())
+        db_session.commit()
+        db_session.add_all([
+            NotificationPreference(user_id=users["weekly"].id, reminder_days_before=[7]),
+            NotificationPreference(user_id=users["opted_out"].id, deadline_reminders=False),
+        ] + [
+            DeviceToken(user_id=user.id, device_token=f"{name}_phone", platform="ios")
+            for name, user in users.items()
+        ] + [DeviceToken(user_id=users["default"].id, device_token="default_android", platform="android")])
+        db_session.commit()
+
+        service = DeadlineNotificationService(db_session)
+        assert set(service.reminder_device_tokens(7)) == {"default_phone", "weekly_phone"}
+        assert service.reminder_device_tokens(3) == ["default_phone"]
+
+    def test_programs_bucketed_into_reminder_windows(self, db_session, monkeypatch):
+        """Test that one query finds each window's programs and nothing in between."""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        db_session.add_all([
+            GrantProgram(id=f"due_{days}", name=f"Due {days}", agency="SBA",
+                         category=GrantCategory.SMALL_BUSINESS, is_active=True,
+                         deadline=today + timedelta(days=days, hours=23, minutes=59))
+            for days in (1, 2, 3, 7)
+        ])
+        db_session.commit()
+
+        service = DeadlineNotificationService(db_session)
+        sent = []
+
+        async def fake_send(program, time_text, device_tokens):
+            sent.append((program.id, time_text))
+
+        monkeypatch.setattr(service, "reminder_device_tokens", lambda days: ["phone"])
+        monkeypatch.setattr(service, "_send_deadline_reminder", fake_send)
+        asyncio.run(service.check_and_send_deadline_reminders())
+
+        assert sent == [("due_7", "in 7 days"), ("due_3", "in 3 days"), ("due_1", "tomorrow")]
+
+    def test_windows_sent_concurrently_despite_failures(self, db_session, monkeypatch):
+        """Test that every window's reminders go out together and one failure doesn't stop the rest."""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        db_session.add_all([
+            GrantProgram(id=f"burst_{days}", name=f"Burst {days}", agency="SBA",
+                         category=GrantCategory.SMALL_BUSINESS, is_active=True,
+                         deadline=today + timedelta(days=days, hours=12))
+            for days in (1, 3, 7)
+        ])
+        db_session.commit()
+
+        service = DeadlineNotificationService(db_session)
+        sent = []
+
+        async def fake_send(program, time_text, device_tokens):
+            if program.id == "burst_3":
+                raise RuntimeError("APNs unavailable")
+            sent.append(program.id)
+
+        probe, peak = concurrency_probe(fake_send)
+        monkeypatch.setattr(service, "reminder_device_tokens", lambda days: ["phone"])
+        monkeypatch.setattr(service, "_send_deadline_reminder", probe)
+        asyncio.run(service.check_and_send_deadline_reminders())
+
+        assert peak() == 3
+        assert sorted(sent) == ["burst_1", "burst_7"]
+
+
+class TestSendToUser:
+    """Tests for pushing to every device a user has registered."""
+
+    def test_send_to_user_fans_out_concurrently(self, db_session, monkeypatch):
+        """Test that all iOS devices are sent to at once and successes are counted."""
+        user = User(email="devices@example.com", hashed_password="x")
+        db_session.add(user)
+        db_session.commit()
+        db_session.add_all([
+            DeviceToken(user_id=user.id, device_token=f"token{i}", platform="ios") for i in range(3)
+        ] + [DeviceToken(user_id=user.id, device_token="droid", platform="android")])
+        db_session.commit()
+
+        apns = APNsService()
+        payloads = set()
+
+        async def fake_send_payload(device_token, payload):
+            payloads.add(payload)
+            return device_token != "token0"
+
+        probe, peak = concurrency_probe(fake_send_payload)
+        monkeypatch.setattr(apns, "send_payload", probe)
+        sent = asyncio.run(apns.send_to_user(db_session, user.id, "Title", "Body"))
+
+        assert sent == 2
+        assert peak() == 3
+        assert payloads == {b'{"aps":{"alert":{"title":"Title","body":"Body"},"sound":"default"}}'}
+
+    def test_send_to_users_fetches_tokens_in_one_query(self, db_session, monkeypatch):
+        """Test that a multi-user send looks up every user's devices with a single SELECT."""
+        users = [User(email=f"bulk{i}@example.com", hashed_password="x") for i in range(3)]
+        db_session.add_all(users)
+        db_session.commit()
+        db_session.add_all([
+            DeviceToken(user_id=user.id, device_token=f"bulk{i}_phone", platform="ios")
+            for i, user in enumerate(users)
+        ])
+        db_session.commit()
+
+        apns = APNsService()
+        sent_to = []
+
+        async def fake_send_payload(device_token, payload):
+            sent_to.append(device_token)
+            return True
+
+        monkeypatch.setattr(apns, "send_payload", fake_send_payload)
+        with capture_statements() as statements:
+            sent = asyncio.run(apns.send_to_users(db_session, [user.id for user in users[:2]], "Title", "Body"))
+
+        assert sent == 2
+        assert sorted(sent_to) == ["bulk0_phone", "bulk1_phone"]
+        assert len(statements) == 1
+
+    def test_fan_out_runs_in_batches(self, monkeypatch):
+        """Test that a broadcast never schedules more than a batch of sends at once."""
+        apns = APNsService()
+        monkeypatch.setattr(apns, "FANOUT_BATCH_SIZE", 4)
+
+        async def fake_send_payload(device_token, payload):
+            return True
+
+        probe, peak = concurrency_probe(fake_send_payload, delay=0.001)
+        monkeypatch.setattr(apns, "send_payload", probe)
+        sent = asyncio.run(apns.send_payload_to_all([f"token{i}" for i in range(10)], b"{}"))
+
+        assert sent == 10
+        assert peak() == 4
+
+
+class TestProviderToken:
+    """Tests for signing the APNs provider token."""
+
+    def test_token_and_key_shared_across_instances(self, tmp_path):
+        """Test that the key file is read and the JWT signed once for every service."""
+        signing_key = ec.generate_private_key(ec.SECP256R1())
+        key_file = tmp_path / "AuthKey.p8"
+        key_file.write_bytes(signing_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+        services = [APNsService() for _ in range(2)]
+        for service in services:
+            service.team_id, service.key_id, service.key_path = "TEAM", "SHAREDKEY", str(key_file)
+
+        token = services[0]._generate_token()
+        key_file.unlink()
+        assert services[1]._generate_token() == token
+
+        claims = jwt.decode(token, signing_key.public_key(), algorithms=["ES256"])
+        assert claims["iss"] == "TEAM"
+        assert jwt.get_unverified_header(token)["kid"] == "SHAREDKEY"
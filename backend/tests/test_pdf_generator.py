@@ -0,0 +1,61 @@
+"""Tests for the PDF generation service."""
+from app.models.database import Application, ApplicationStatus, GrantCategory, GrantProgram, UserProfile
+from app.services.pdf_generator import (
+    generate_application_pdf, generate_grant_summary_pdf, iter_eligibility_report_pdf
+)
+
+
+class TestEligibilityReportPdf:
+    """Tests for rendering the eligibility report."""
+
+    def test_report_streams_in_chunks(self):
+        """Test that the report arrives as bounded chunks that join into one PDF."""
+        profile = UserProfile(organization_name="Chunked Org", state="TX")
+        programs = [
+            GrantProgram(id=f"prog_{i}", name=f"Program {i}", agency="SBA",
+                         category=GrantCategory.SMALL_BUSINESS, description="Funding for small firms. " * 20)
+            for i in range(60)
+        ]
+
+        chunks = list(iter_eligibility_report_pdf(profile, programs, chunk_size=4096))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 4096 for chunk in chunks)
+        pdf = b"".join(chunks)
+        assert pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+
+    def test_program_details_escape_markup(self):
+        """Test that agency names with markup characters render instead of breaking the Paragraph."""
+        profile = UserProfile(organization_name="Escape Org")
+        program = GrantProgram(id="hud", name="Housing", agency="HUD & <Partners>",
+                               category=GrantCategory.HOUSING)
+
+        pdf = b"".join(iter_eligibility_report_pdf(profile, [program]))
+
+        assert pdf.startswith(b"%PDF")
+
+
+class TestGrantSummaryPdf:
+    """Tests for rendering a grant program summary."""
+
+    def test_markup_characters_in_program_data(self):
+        """Test that names, descriptions and query-string URLs with '&' or '<' are escaped."""
+        program = GrantProgram(
+            id="r_and_d", name="R&D <Pilot> Grants", agency="NSF & DOE",
+            category=GrantCategory.TECHNOLOGY, description="Funds R&D where cost<budget.",
+            program_url="https://example.gov/grants?id=1&type=rd",
+        )
+
+        assert generate_grant_summary_pdf(program).startswith(b"%PDF")
+
+
+class TestApplicationPdf:
+    """Tests for rendering a draft application."""
+
+    def test_markup_characters_in_narratives(self):
+        """Test that user-chosen section names and text with '&' or '<' are escaped."""
+        application = Application(user_id="user", program_id="r_and_d",
+                                  status=ApplicationStatus.DRAFT, completeness_score=50)
+        narratives = {"r<d": "Costs stay < budget", "budget_&_timeline": "Q1 & Q2"}
+
+        assert generate_application_pdf(application, narratives=narratives).startswith(b"%PDF")
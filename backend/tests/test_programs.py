@@ -1,7 +1,12 @@
 """Tests for grant programs endpoints."""
+from datetime import datetime
+
 import pytest
+from sqlalchemy import insert
 
+from app.api.programs import PROGRAM_RESPONSE_COLUMNS, ProgramResponse, build_program_response, bulk_upsert_programs
 from app.models.database import GrantProgram, GrantCategory
+from tests.conftest import capture_statements
 
 
 class TestListPrograms:
@@ -25,70 +30,106 @@ class TestListPrograms:
         assert data["programs"][0]["id"] == sample_program.id
         assert data["programs"][0]["name"] == sample_program.name
 
-    def test_list_programs_filter_by_category(self, client, db_session):
-        """Test filtering programs by category."""
-        # Create programs in different categories
-        program1 = GrantProgram(
-            id="healthcare_1",
-            name="Healthcare Grant",
-            category=GrantCategory.HEALTHCARE,
-            is_active=True,
-        )
-        program2 = GrantProgram(
-            id="education_1",
-            name="Education Grant",
-            category=GrantCategory.EDUCATION,
-            is_active=True,
-        )
-        db_session.add_all([program1, program2])
+    def test_list_programs_gzip(self, client, db_session):
+        """Test that large JSON responses are gzip-compressed."""
+        db_session.add_all([
+            GrantProgram(id=f"gzip_{i}", name=f"Compressible Grant {i}",
+                         category=GrantCategory.SMALL_BUSINESS, is_active=True)
+            for i in range(20)
+        ])
         db_session.commit()
 
-        response = client.get("/api/programs/?category=healthcare")
+        response = client.get("/api/programs/", headers={"Accept-Encoding": "gzip"})
         assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        assert data["programs"][0]["category"] == "healthcare"
-
-    def test_list_programs_search(self, client, db_session):
-        """Test searching programs."""
-        program = GrantProgram(
-            id="unique_grant",
-            name="Unique Agriculture Grant",
-            description="For farmers only",
-            category=GrantCategory.AGRICULTURE,
-            is_active=True,
-        )
-        db_session.add(program)
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["total"] == 20
+
+    def test_list_programs_paginated(self, client, db_session):
+        """Test that limit/offset page the results while total counts all matches."""
+        db_session.add_all([
+            GrantProgram(id=f"page_{i}", name=f"Grant {i:02d}",
+                         category=GrantCategory.SMALL_BUSINESS, is_active=True)
+            for i in range(5)
+        ])
         db_session.commit()
 
-        response = client.get("/api/programs/?search=agriculture")
+        data = client.get("/api/programs/?limit=2&offset=2").json()
+        assert data["total"] == 5
+        assert [p["id"] for p in data["programs"]] == ["page_2", "page_3"]
+
+        data = client.get("/api/programs/?limit=2&offset=10").json()
+        assert data["total"] == 5
+        assert data["programs"] == []
+
+    def test_list_programs_not_modified(self, client, db_session, sample_program):
+        """Test that If-None-Match gets a 304 until a program changes."""
+        etag = client.get("/api/programs/").headers["etag"]
+
+        response = client.get("/api/programs/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert client.get("/api/programs/?category=healthcare").headers["etag"] != etag
+
+        sample_program.name = "Renamed Grant Program"
+        db_session.commit()
+        response = client.get("/api/programs/", headers={"If-None-Match": etag})
         assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        assert "Agriculture" in data["programs"][0]["name"]
-
-    def test_list_programs_active_only(self, client, db_session):
-        """Test that inactive programs are filtered by default."""
-        active = GrantProgram(
-            id="active_1",
-            name="Active Grant",
-            category=GrantCategory.TECHNOLOGY,
-            is_active=True,
-        )
-        inactive = GrantProgram(
-            id="inactive_1",
-            name="Inactive Grant",
-            category=GrantCategory.TECHNOLOGY,
-            is_active=False,
-        )
-        db_session.add_all([active, inactive])
+        assert response.json()["programs"][0]["name"] == "Renamed Grant Program"
+
+
+@pytest.fixture(scope="class")
+def mixed_programs(db_connection):
+    """Create programs across categories and active states, once per test class."""
+    db_connection.execute(insert(GrantProgram), [
+        {"id": "healthcare_1", "name": "Healthcare Grant",
+         "category": GrantCategory.HEALTHCARE, "is_active": True},
+        {"id": "education_1", "name": "Education Grant",
+         "category": GrantCategory.EDUCATION, "is_active": True},
+        {"id": "unique_grant", "name": "Unique Agriculture Grant", "description": "For farmers only",
+         "category": GrantCategory.AGRICULTURE, "is_active": True},
+        {"id": "active_1", "name": "Active Grant",
+         "category": GrantCategory.TECHNOLOGY, "is_active": True},
+        {"id": "inactive_1", "name": "Inactive Grant",
+         "category": GrantCategory.TECHNOLOGY, "is_active": False},
+    ])
+
+
+class TestFilterPrograms:
+    """Tests for filtering the program list."""
+
+    @pytest.mark.parametrize("query,expected_ids", [
+        ("?category=healthcare", {"healthcare_1"}),
+        ("?search=agriculture", {"unique_grant"}),
+        ("", {"healthcare_1", "education_1", "unique_grant", "active_1"}),
+        ("?active_only=false", {"healthcare_1", "education_1", "unique_grant", "active_1", "inactive_1"}),
+    ])
+    def test_list_programs_filtered(self, client, mixed_programs, query, expected_ids):
+        """Test that category, search and active filters select the matching programs."""
+        data = client.get(f"/api/programs/{query}").json()
+        assert data["total"] == len(expected_ids)
+        assert {p["id"] for p in data["programs"]} == expected_ids
+
+
+class TestBuildProgramResponse:
+    """Tests for building program responses without validation."""
+
+    def test_matches_validated_response(self, db_session, sample_program):
+        """Test that entity and list-row responses equal a fully validated one."""
+        sample_program.deadline = datetime(2030, 6, 30, 17, 0)
         db_session.commit()
 
-        response = client.get("/api/programs/")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        assert data["programs"][0]["id"] == "active_1"
+        validated = ProgramResponse.model_validate({
+            **{c.key: getattr(sample_program, c.key) for c in PROGRAM_RESPONSE_COLUMNS},
+            "category": sample_program.category.value,
+        })
+        row = db_session.query(*PROGRAM_RESPONSE_COLUMNS).filter(
+            GrantProgram.id == sample_program.id
+        ).one()
+
+        for source in (sample_program, row):
+            built = build_program_response(source)
+            assert built.model_dump(mode="json") == validated.model_dump(mode="json")
+            assert built.model_dump_json() == validated.model_dump_json()
 
 
 class TestGetProgram:
@@ -103,6 +144,24 @@ class TestGetProgram:
         assert data["name"] == sample_program.name
         assert data["agency"] == sample_program.agency
 
+    def test_get_program_not_modified(self, client, sample_program):
+        """Test that a matching If-None-Match gets a 304 for a single program."""
+        etag = client.get(f"/api/programs/{sample_program.id}").headers["etag"]
+
+        response = client.get(f"/api/programs/{sample_program.id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_get_program_served_from_cache(self, client, db_session, sample_program):
+        """Test that repeat lookups by id do not hit the database."""
+        client.get(f"/api/programs/{sample_program.id}")
+
+        with capture_statements() as statements:
+            response = client.get(f"/api/programs/{sample_program.id}")
+
+        assert response.status_code == 200
+        assert response.json()["name"] == sample_program.name
+        assert not [s for s in statements if "FROM grant_programs" in s]
+
     def test_get_program_not_found(self, client):
         """Test getting a non-existent program."""
         response = client.get("/api/programs/nonexistent")
@@ -110,6 +169,37 @@ class TestGetProgram:
         assert "not found" in response.json()["detail"].lower()
 
 
+class TestProgramPdf:
+    """Tests for downloading a program summary PDF."""
+
+    def test_download_program_pdf(self, client, sample_program):
+        """Test that the summary PDF is returned with caching headers."""
+        response = client.get(f"/api/programs/{sample_program.id}/pdf")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF")
+        assert response.headers["cache-control"] == "public, max-age=3600"
+        assert response.headers["content-length"] == str(len(response.content))
+        assert response.headers["content-disposition"] == f'attachment; filename="grant_{sample_program.id}.pdf"'
+
+        again = client.get(f"/api/programs/{sample_program.id}/pdf")
+        assert again.content == response.content
+        assert again.headers["etag"] == response.headers["etag"]
+
+    def test_download_program_pdf_not_modified(self, client, sample_program):
+        """Test that a matching If-None-Match gets a 304 with no body."""
+        etag = client.get(f"/api/programs/{sample_program.id}/pdf").headers["etag"]
+
+        response = client.get(f"/api/programs/{sample_program.id}/pdf", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_download_program_pdf_not_found(self, client):
+        """Test downloading a PDF for a non-existent program."""
+        response = client.get("/api/programs/nonexistent/pdf")
+        assert response.status_code == 404
+
+
 class TestCategories:
     """Tests for categories endpoint."""
 
@@ -117,10 +207,49 @@ class TestCategories:
         """Test listing all categories."""
         response = client.get("/api/programs/categories")
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
         data = response.json()
-        assert "categories" in data
-        assert len(data["categories"]) > 0
-        # Check that each category has id and name
-        for cat in data["categories"]:
-            assert "id" in cat
-            assert "name" in cat
+        assert [set(cat) for cat in data["categories"]] == [{"id", "name"}] * len(GrantCategory)
+        assert [cat["id"] for cat in data["categories"]] == [c.value for c in GrantCategory]
+        assert {"id": "small_business", "name": "Small Business"} in data["categories"]
+
+
+class TestSeedPrograms:
+    """Tests for seeding sample programs."""
+
+    def test_seed_programs(self, client, db_session):
+        """Test that seeding inserts every sample program once."""
+        response = client.post("/api/programs/seed")
+        assert response.status_code == 200
+        seeded = response.json()["seeded"]
+        assert seeded > 0
+        assert db_session.query(GrantProgram).count() == seeded
+
+        program = client.get("/api/programs/sba_7a").json()
+        assert program["category"] == "small_business"
+        assert program["deadline"] is None
+        deadline = datetime.fromisoformat(client.get("/api/programs/sbir_phase1").json()["deadline"])
+        assert 64 <= (deadline - datetime.now()).days <= 65
+
+        response = client.post("/api/programs/seed")
+        assert response.json()["seeded"] == 0
+
+    def test_bulk_upsert_programs(self, db_session):
+        """Test that one upsert inserts new programs and updates existing ones by id."""
+        rows = [
+            {"id": "upsert_a", "name": "Program A", "category": GrantCategory.HOUSING, "is_active": True},
+            {"id": "upsert_b", "name": "Program B", "category": GrantCategory.HOUSING,
+             "deadline": datetime(2030, 1, 1), "is_active": True},
+        ]
+        assert bulk_upsert_programs(db_session, rows) == 2
+        db_session.commit()
+
+        bulk_upsert_programs(db_session, [{"id": "upsert_a", "name": "Program A (renamed)"}])
+        db_session.commit()
+        db_session.expire_all()
+
+        assert db_session.query(GrantProgram).count() == 2
+        program = db_session.get(GrantProgram, "upsert_a")
+        assert program.name == "Program A (renamed)"
+        assert program.category == GrantCategory.HOUSING
+        assert db_session.get(GrantProgram, "upsert_b").deadline == datetime(2030, 1, 1)